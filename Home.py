@@ -3,7 +3,8 @@ import streamlit as st
 from dbtc import dbtCloudClient
 
 # first party
-from utils.client import dynamic_request
+from utils.catalog import load_catalog
+from utils.client import begin_rerun, dynamic_request
 from utils.helpers import list_to_dict
 
 
@@ -15,6 +16,7 @@ st.set_page_config(
     page_icon="👋",
     
 )
+begin_rerun('Home')
 st.write("# Welcome to the dbtc Explorer! 👋")
 
 
@@ -54,7 +56,6 @@ st.markdown(
 )
 
 if st.session_state.service_token != '':
-    st.cache_data.clear()
     st.session_state.dbtc_client = dbtCloudClient(
         service_token=st.session_state.service_token,
         host=st.session_state.dbt_cloud_host,
@@ -72,10 +73,9 @@ if st.session_state.service_token != '':
             'Please try again.'
         )
     else:
-        projects = dynamic_request(
+        st.session_state.catalog = load_catalog(
             st.session_state.dbtc_client.cloud,
-            'list_projects',
-            st.session_state.account_id
-        ).get('data', [])
-        st.session_state.projects = projects
+            st.session_state.account_id,
+        )
+        st.session_state.projects = st.session_state.catalog['projects']
         st.success('Success!  Explore the rest of the app!')
@@ -0,0 +1,89 @@
+"""Micro-benchmark for utils.runs.enhance_df on synthetic run frames.
+
+    $ python -m benchmarks.enhance_df [--sizes 10000 100000] [--repeat 5]
+
+Compares the vectorized parser against the previous row-wise implementation.
+"""
+# stdlib
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+# third party
+import pandas as pd
+
+# first party
+from utils.runs import DATETIME_COLUMNS, enhance_df
+
+
+def _duration(seconds: int) -> str:
+    h, remainder = divmod(seconds, 3600)
+    m, s = divmod(remainder, 60)
+    return f'{h:02d}:{m:02d}:{s:02d}'
+
+
+def synthetic_runs(n: int, seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    runs = []
+    for i in range(n):
+        created_at = start + timedelta(minutes=15 * i, microseconds=rng.randrange(10 ** 6))
+        queued = rng.randrange(5, 120)
+        run = rng.randrange(30, 3 * 3600)
+        timestamps = {c: str(created_at + timedelta(seconds=queued)) for c in DATETIME_COLUMNS}
+        timestamps['created_at'] = str(created_at)
+        timestamps['dequeued_at'] = None if i % 50 == 0 else timestamps['dequeued_at']
+        runs.append({
+            'id': n - i,
+            'duration': _duration(queued + run),
+            'queued_duration': _duration(queued),
+            'run_duration': _duration(run),
+            **timestamps,
+        })
+    return runs
+
+
+def _legacy_get_minutes(time_str: str):
+    h, m, s = time_str.split(':')
+    return round(int(h) * 60 + int(m) + (int(s) / 60), 1)
+
+
+def legacy_enhance_df(df: pd.DataFrame) -> pd.DataFrame:
+    df['duration_m'] = df['duration'].apply(_legacy_get_minutes)
+    df['queued_duration_m'] = df['queued_duration'].apply(_legacy_get_minutes)
+    df['run_duration_m'] = df['run_duration'].apply(_legacy_get_minutes)
+    df[DATETIME_COLUMNS] = df[DATETIME_COLUMNS].apply(pd.to_datetime)
+    df['created_at'] = df['created_at'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    df['run_duration_m_avg'] = df['run_duration_m'].mean()
+    df['queued_duration_m_avg'] = df['queued_duration_m'].mean()
+    return df
+
+
+def best_of(func: Callable, df: pd.DataFrame, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        frame = df.copy()
+        start = time.perf_counter()
+        func(frame)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f'{"runs":>8} {"legacy (s)":>12} {"vectorized (s)":>15} {"speedup":>8}')
+    for size in args.sizes:
+        df = pd.DataFrame(synthetic_runs(size))
+        legacy = best_of(legacy_enhance_df, df, args.repeat)
+        vectorized = best_of(enhance_df, df, args.repeat)
+        print(f'{size:>8} {legacy:>12.4f} {vectorized:>15.4f} {legacy / vectorized:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
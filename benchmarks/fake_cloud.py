@@ -0,0 +1,646 @@
+"""A local stand-in for the dbt Cloud Admin and Metadata APIs.
+
+Serves seeded, synthetic accounts, projects, environments, jobs, runs and
+models over plain HTTP so the app can be benchmarked offline:
+
+    Admin API      /api/{v2,v3,v4}/accounts/...
+    Metadata API   POST /graphql
+
+Every request is counted by endpoint so callers can see how many round trips
+a page makes.  Use `patch_dbtc` to point dbtc's https URLs at the server.
+"""
+# stdlib
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+STATUSES = {1: 'Queued', 2: 'Starting', 3: 'Running', 10: 'Success', 20: 'Error', 30: 'Cancelled'}
+# Status of a triggered run by seconds since it was triggered
+TRIGGERED_STATUSES = [(0, 1), (1, 2), (2, 3), (6, 10)]
+MAX_LIMIT = 100
+
+
+@dataclass
+class Sizes:
+    accounts: int = 1
+    projects: int = 2
+    jobs: int = 20
+    runs: int = 2000
+    models: int = 200
+    threads: int = 4
+
+
+def _duration(seconds: int) -> str:
+    h, remainder = divmod(seconds, 3600)
+    m, s = divmod(remainder, 60)
+    return f'{h:02d}:{m:02d}:{s:02d}'
+
+
+class FakeCloud:
+    """Synthetic dbt Cloud data.  Runs and models are generated from a seed."""
+
+    def __init__(self, sizes: Sizes = None, seed: int = 0):
+        self.sizes = sizes or Sizes()
+        self.seed = seed
+        rng = random.Random(seed)
+        self.accounts = []
+        self.projects = []
+        self.environments = []
+        self.jobs = []
+        self.runs = []
+        self.entities: Dict[str, List[Dict]] = {
+            'connections': [],
+            'credentials': [],
+            'groups': [],
+            'users': [],
+            'service-tokens': [],
+        }
+        ids = iter(range(1, 10 ** 9))
+        start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        for _ in range(self.sizes.accounts):
+            account = {'id': next(ids), 'name': f'Account {len(self.accounts) + 1}'}
+            self.accounts.append(account)
+            for kind in ('groups', 'users', 'service-tokens'):
+                for i in range(5):
+                    self.entities[kind].append({
+                        'id': next(ids),
+                        'account_id': account['id'],
+                        'name': f'{kind} {i}',
+                        'email': f'user{i}@example.com',
+                    })
+            for p in range(self.sizes.projects):
+                project = {
+                    'id': next(ids),
+                    'account_id': account['id'],
+                    'name': f'Project {p + 1}',
+                    'docs_job_id': None,
+                }
+                self.projects.append(project)
+                for kind in ('connections', 'credentials'):
+                    self.entities[kind].append({
+                        'id': next(ids),
+                        'account_id': account['id'],
+                        'project_id': project['id'],
+                        'name': f'{kind} {p}',
+                        'type': 'snowflake',
+                        'schema': f'analytics_{p}',
+                        'user': 'dbt',
+                    })
+                for env_type in ('deployment', 'development'):
+                    self.environments.append({
+                        'id': next(ids),
+                        'account_id': account['id'],
+                        'project_id': project['id'],
+                        'name': env_type.capitalize(),
+                        'type': env_type,
+                    })
+                environment = self.environments[-2]
+                project_jobs = []
+                for j in range(self.sizes.jobs):
+                    job = {
+                        'id': next(ids),
+                        'account_id': account['id'],
+                        'project_id': project['id'],
+                        'environment_id': environment['id'],
+                        'name': f'Job {j + 1}',
+                        'triggers': {
+                            'github_webhook': j == 0,
+                            'git_provider_webhook': False,
+                            'schedule': j != 0,
+                        },
+                        'execute_steps': ['dbt build'],
+                    }
+                    project_jobs.append(job)
+                self.jobs.extend(project_jobs)
+                project['docs_job_id'] = project_jobs[-1]['id']
+                for r in range(self.sizes.runs):
+                    job = project_jobs[r % len(project_jobs)]
+                    created_at = start + timedelta(minutes=10 * r)
+                    queued = rng.randrange(5, 120)
+                    run_seconds = rng.randrange(60, 3600)
+                    status = rng.choices([10, 20, 30], weights=[90, 7, 3])[0]
+                    started_at = created_at + timedelta(seconds=queued)
+                    finished_at = started_at + timedelta(seconds=run_seconds)
+                    self.runs.append({
+                        'id': next(ids),
+                        'account_id': account['id'],
+                        'project_id': project['id'],
+                        'environment_id': environment['id'],
+                        'job_definition_id': job['id'],
+                        'trigger_id': next(ids),
+                        'status': status,
+                        'status_humanized': STATUSES[status],
+                        'status_message': None,
+                        'in_progress': False,
+                        'is_complete': True,
+                        'is_success': status == 10,
+                        'is_error': status == 20,
+                        'is_cancelled': status == 30,
+                        'dbt_version': '1.4.0-latest',
+                        'git_branch': 'main',
+                        'git_sha': f'{rng.getrandbits(160):040x}',
+                        'href': f'https://cloud.getdbt.com/#/runs/{r}',
+                        'duration': _duration(queued + run_seconds),
+                        'queued_duration': _duration(queued),
+                        'run_duration': _duration(run_seconds),
+                        'created_at': str(created_at),
+                        'updated_at': str(finished_at),
+                        'dequeued_at': str(started_at),
+                        'started_at': str(started_at),
+                        'finished_at': str(finished_at),
+                        'should_start_at': str(created_at),
+                        'last_checked_at': str(finished_at),
+                        'last_heartbeat_at': str(finished_at),
+                    })
+        self.jobs_by_id = {j['id']: j for j in self.jobs}
+        self.runs_by_id = {r['id']: r for r in self.runs}
+        self._ids = ids
+        self._lock = threading.Lock()
+
+    # Admin API
+
+    def list_runs(self, account_id: int, params: Dict[str, str]) -> Tuple[List, int]:
+        runs = [r for r in self.runs if r['account_id'] == account_id]
+        for key in ('job_definition_id', 'environment_id'):
+            if params.get(key):
+                runs = [r for r in runs if r[key] == int(params[key])]
+        if params.get('project_id__in'):
+            project_ids = json.loads(params['project_id__in'])
+            runs = [r for r in runs if r['project_id'] in project_ids]
+        if params.get('status__in'):
+            statuses = json.loads(params['status__in'])
+            runs = [r for r in runs if r['status'] in statuses]
+        reverse = params.get('order_by', 'id').startswith('-')
+        runs = sorted(runs, key=lambda r: r['id'], reverse=reverse)
+        total = len(runs)
+        offset = int(params.get('offset') or 0)
+        limit = min(int(params.get('limit') or MAX_LIMIT), MAX_LIMIT)
+        runs = runs[offset:offset + limit]
+        related = (params.get('include_related') or '').split(',')
+        return [self._with_related(r, related) for r in runs], total
+
+    def _with_related(self, run: Dict, related: List[str]) -> Dict:
+        run = dict(run)
+        if 'job' in related:
+            run['job'] = self.jobs_by_id[run['job_definition_id']]
+        if 'trigger' in related:
+            run['trigger'] = {'id': run['trigger_id'], 'cause': 'Scheduled'}
+        return run
+
+    def trigger(self, account_id: int, job_id: int) -> Optional[Dict]:
+        """Start a run of a job.  It's queued, then running, then succeeds."""
+        job = self.jobs_by_id.get(job_id)
+        if job is None or job['account_id'] != account_id:
+            return None
+
+        with self._lock:
+            run_id = next(self._ids)
+        now = datetime.now(timezone.utc)
+        run = {
+            'id': run_id,
+            'account_id': account_id,
+            'project_id': job['project_id'],
+            'environment_id': job['environment_id'],
+            'job_definition_id': job_id,
+            'status_message': None,
+            'dbt_version': '1.4.0-latest',
+            'git_branch': 'main',
+            'href': f'https://cloud.getdbt.com/#/runs/{run_id}',
+            'created_at': str(now),
+            'started_at': str(now),
+            'finished_at': str(now),
+            'triggered_at': time.monotonic(),
+        }
+        self.runs_by_id[run_id] = run
+        return self.progress(run)
+
+    def progress(self, run: Dict) -> Dict:
+        """Bring a triggered run's status up to date."""
+        if 'triggered_at' not in run:
+            return run
+
+        elapsed = time.monotonic() - run['triggered_at']
+        status = [s for after, s in TRIGGERED_STATUSES if elapsed >= after][-1]
+        run.update({
+            'status': status,
+            'status_humanized': STATUSES[status],
+            'in_progress': status < 10,
+            'is_complete': status >= 10,
+            'is_success': status == 10,
+            'is_error': status == 20,
+            'is_cancelled': status == 30,
+        })
+        return run
+
+    def run_results(self, run_id: int) -> Optional[Dict]:
+        """run_results.json for a finished run: its models, then a test of each."""
+        run = self.runs_by_id.get(run_id)
+        if run is None or not run['is_complete']:
+            return None
+
+        results = []
+        models = self.models(run['job_definition_id'], run_id)
+        for model in models:
+            results.append({
+                'status': model['status'],
+                'timing': [
+                    {
+                        'name': 'compile',
+                        'started_at': model['executeStartedAt'],
+                        'completed_at': model['executeStartedAt'],
+                    },
+                    {
+                        'name': 'execute',
+                        'started_at': model['executeStartedAt'],
+                        'completed_at': model['executeCompletedAt'],
+                    },
+                ],
+                'thread_id': model['threadId'],
+                'execution_time': model['executionTime'],
+                'adapter_response': {'_message': 'SUCCESS 1', 'rows_affected': 1},
+                'message': 'SUCCESS 1',
+                'failures': None,
+                'unique_id': model['uniqueId'],
+                'compiled_code': model['compiledSql'],
+            })
+        for model in models:
+            results.append({
+                'status': 'pass',
+                'timing': [],
+                'thread_id': model['threadId'],
+                'execution_time': 0.0,
+                'adapter_response': {},
+                'message': None,
+                'failures': 0,
+                'unique_id': f'test.analytics.not_null_{model["name"]}_id',
+                'compiled_code': f'select id from analytics.{model["name"]} where id is null',
+            })
+        return {
+            'metadata': {
+                'dbt_schema_version': 'https://schemas.getdbt.com/dbt/run-results/v4.json',
+                'dbt_version': '1.4.0',
+                'generated_at': run['finished_at'],
+            },
+            'results': results,
+            'elapsed_time': sum(m['executionTime'] for m in models),
+            'args': {'which': 'build'},
+        }
+
+    # Metadata API
+
+    def models(self, job_id: int, run_id: Optional[int] = None) -> List[Dict]:
+        if run_id is None:
+            run_ids = [r['id'] for r in self.runs if r['job_definition_id'] == job_id]
+            if not run_ids:
+                return []
+            run_id = max(run_ids)
+        run = self.runs_by_id.get(run_id)
+        if run is None or run['job_definition_id'] != job_id:
+            return []
+
+        rng = random.Random(f'{self.seed}-{run_id}')
+        clock = [datetime.fromisoformat(run['started_at'])] * self.sizes.threads
+        models = []
+        for i in range(self.sizes.models):
+            thread = min(range(self.sizes.threads), key=lambda t: clock[t])
+            execution_time = round(rng.uniform(0.5, 60), 3)
+            started_at = clock[thread]
+            clock[thread] = started_at + timedelta(seconds=execution_time)
+            name = f'model_{i:04d}'
+            models.append({
+                'name': name,
+                'uniqueId': f'model.analytics.{name}',
+                'runId': run_id,
+                'jobId': job_id,
+                'status': 'success',
+                'threadId': f'Thread-{thread + 1}',
+                'executionTime': execution_time,
+                'executeStartedAt': started_at.isoformat().replace('+00:00', 'Z'),
+                'executeCompletedAt': clock[thread].isoformat().replace('+00:00', 'Z'),
+                'runGeneratedAt': run['finished_at'],
+                'rawSql': f'select * from {{{{ ref("stg_{name}") }}}}',
+                'compiledSql': f'select * from analytics.stg_{name}',
+            })
+        return models
+
+    def resolve(self, field: str, arguments: Dict[str, Any]):
+        job_id = arguments.get('jobId')
+        run_id = arguments.get('runId')
+        if field == 'models':
+            return self.models(job_id, run_id)
+        if field == 'model':
+            for model in self.models(job_id, run_id):
+                if model['uniqueId'] == arguments.get('uniqueId'):
+                    return model
+        return None
+
+
+# A tiny GraphQL reader, enough for the documents dbtc and utils.metadata send
+
+_TOKEN = re.compile(r'\s*(?:(\.\.\.)|([{}():,$!=\[\]])|("(?:[^"\\]|\\.)*")|(-?\d+(?:\.\d+)?)|(\w+))')
+
+
+def _tokenize(document: str) -> List[str]:
+    tokens = []
+    position = 0
+    document = document.strip()
+    while position < len(document):
+        match = _TOKEN.match(document, position)
+        if match is None:
+            raise ValueError(f'Cannot parse GraphQL near {document[position:position + 20]!r}')
+        tokens.append(next(g for g in match.groups() if g is not None))
+        position = match.end()
+    return tokens
+
+
+def _parse_value(tokens: List[str]):
+    token = tokens.pop(0)
+    if token.startswith('"'):
+        return json.loads(token)
+    if token in ('true', 'false'):
+        return token == 'true'
+    if token == 'null':
+        return None
+    if token == '[':
+        values = []
+        while tokens[0] != ']':
+            values.append(_parse_value(tokens))
+            if tokens[0] == ',':
+                tokens.pop(0)
+        tokens.pop(0)
+        return values
+    return float(token) if '.' in token else int(token)
+
+
+def _parse_selection(tokens: List[str]) -> List[Dict]:
+    assert tokens.pop(0) == '{'
+    selections = []
+    while tokens[0] != '}':
+        name = tokens.pop(0)
+        alias = name
+        if tokens[0] == ':':
+            tokens.pop(0)
+            name = tokens.pop(0)
+        arguments = {}
+        if tokens[0] == '(':
+            tokens.pop(0)
+            while tokens[0] != ')':
+                key = tokens.pop(0)
+                assert tokens.pop(0) == ':'
+                arguments[key] = _parse_value(tokens)
+                if tokens[0] == ',':
+                    tokens.pop(0)
+            tokens.pop(0)
+        children = _parse_selection(tokens) if tokens[0] == '{' else None
+        selections.append({'alias': alias, 'name': name, 'arguments': arguments, 'children': children})
+    tokens.pop(0)
+    return selections
+
+
+def parse_query(document: str) -> List[Dict]:
+    tokens = _tokenize(document)
+    while tokens[0] != '{':
+        tokens.pop(0)
+    return _parse_selection(tokens)
+
+
+def _project(value, children: Optional[List[Dict]]):
+    if children is None or value is None:
+        return value
+    if isinstance(value, list):
+        return [_project(v, children) for v in value]
+    return {c['alias']: _project(value.get(c['name']), c['children']) for c in children}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: 'FakeCloudServer'
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if 'gzip' in self.headers.get('Accept-Encoding', '') and len(payload) > 1024:
+            payload = gzip.compress(payload, compresslevel=5)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        self.server.record_bytes(len(payload))
+
+    def _envelope(self, data, total: int = None):
+        body = {'status': {'code': 200, 'is_success': True}, 'data': data}
+        if total is not None:
+            body['extra'] = {'pagination': {'count': len(data), 'total_count': total}}
+        return body
+
+    def _throttled(self) -> bool:
+        if self.server.admit():
+            return False
+
+        self.server.record('THROTTLED', urlparse(self.path).path)
+        payload = json.dumps({'status': {'code': 429, 'is_success': False}}).encode()
+        self.send_response(429)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('Retry-After', '1')
+        self.end_headers()
+        self.wfile.write(payload)
+        return True
+
+    def do_GET(self):
+        if self._throttled():
+            return
+
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        match = re.match(r'^/api/v\d/accounts/?(\d+)?/?(.*?)/?$', url.path)
+        if match is None:
+            self.server.record('GET', url.path)
+            return self._send(404, {'status': {'code': 404, 'is_success': False}})
+
+        cloud = self.server.cloud
+        account_id = int(match.group(1)) if match.group(1) else None
+        rest = match.group(2)
+        endpoint = re.sub(r'\d+', '{id}', rest) or ('accounts' if account_id is None else 'account')
+        self.server.record('GET', endpoint)
+        if account_id is None:
+            return self._send(200, self._envelope(cloud.accounts))
+        if rest == 'projects':
+            projects = [p for p in cloud.projects if p['account_id'] == account_id]
+            return self._send(200, self._envelope(projects, len(projects)))
+        if rest == 'environments':
+            environments = [e for e in cloud.environments if e['account_id'] == account_id]
+            if params.get('project_id__in'):
+                project_ids = json.loads(params['project_id__in'])
+                environments = [e for e in environments if e['project_id'] in project_ids]
+            if params.get('type'):
+                environments = [e for e in environments if e['type'] == params['type']]
+            return self._send(200, self._envelope(environments, len(environments)))
+        if rest == 'jobs':
+            jobs = [j for j in cloud.jobs if j['account_id'] == account_id]
+            if params.get('environment_id'):
+                jobs = [j for j in jobs if j['environment_id'] == int(params['environment_id'])]
+            if params.get('project_id__in'):
+                project_ids = json.loads(params['project_id__in'])
+                jobs = [j for j in jobs if j['project_id'] in project_ids]
+            return self._send(200, self._envelope(jobs, len(jobs)))
+        if rest == 'runs':
+            runs, total = cloud.list_runs(account_id, params)
+            return self._send(200, self._envelope(runs, total))
+        run_match = re.match(r'^runs/(\d+)$', rest)
+        if run_match:
+            run = cloud.runs_by_id.get(int(run_match.group(1)))
+            if run is None:
+                return self._send(404, {'status': {'code': 404, 'is_success': False}})
+            cloud.progress(run)
+            related = (params.get('include_related') or '').split(',')
+            return self._send(200, self._envelope(cloud._with_related(run, related)))
+        artifact_match = re.match(r'^runs/(\d+)/artifacts/run_results.json$', rest)
+        if artifact_match:
+            run_results = cloud.run_results(int(artifact_match.group(1)))
+            if run_results is None:
+                return self._send(404, {'status': {'code': 404, 'is_success': False}})
+            return self._send(200, run_results)
+        entity_match = re.match(r'^(?:projects/(\d+)/)?([\w-]+)$', rest)
+        if entity_match and entity_match.group(2) in cloud.entities:
+            entities = [e for e in cloud.entities[entity_match.group(2)] if e['account_id'] == account_id]
+            if entity_match.group(1):
+                entities = [e for e in entities if e.get('project_id') == int(entity_match.group(1))]
+            return self._send(200, self._envelope(entities, len(entities)))
+        return self._send(404, {'status': {'code': 404, 'is_success': False}})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}')
+        if self._throttled():
+            return
+
+        trigger_match = re.match(r'^/api/v2/accounts/(\d+)/jobs/(\d+)/run/?$', urlparse(self.path).path)
+        if trigger_match:
+            self.server.record('POST', 'jobs/{id}/run')
+            run = self.server.cloud.trigger(int(trigger_match.group(1)), int(trigger_match.group(2)))
+            if run is None:
+                return self._send(404, {'status': {'code': 404, 'is_success': False}})
+            return self._send(200, self._envelope(run))
+
+        if urlparse(self.path).path != '/graphql':
+            self.server.record('POST', self.path)
+            return self._send(404, {'errors': [{'message': 'Not found'}]})
+
+        selections = parse_query(body.get('query', ''))
+        self.server.record('POST', 'graphql', len(selections))
+        data = {}
+        for selection in selections:
+            value = self.server.cloud.resolve(selection['name'], selection['arguments'])
+            data[selection['alias']] = _project(value, selection['children'])
+        return self._send(200, {'data': data})
+
+
+class FakeCloudServer(ThreadingHTTPServer):
+    """Serve a FakeCloud on 127.0.0.1, counting requests by endpoint.
+
+    With rate_limit (requests per second), requests over the limit get a 429
+    with Retry-After, like dbt Cloud's own rate limiting.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, cloud: FakeCloud, port: int = 0, rate_limit: Optional[float] = None):
+        super().__init__(('127.0.0.1', port), _Handler)
+        self.cloud = cloud
+        self.rate_limit = rate_limit
+        self._tokens = rate_limit or 0.0
+        self._updated = time.monotonic()
+        self.calls: Counter = Counter()
+        self.lookups = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def host(self) -> str:
+        return f'{self.server_address[0]}:{self.server_address[1]}'
+
+    def record(self, method: str, endpoint: str, lookups: int = 1):
+        with self._lock:
+            self.calls[f'{method} {endpoint}'] += 1
+            self.lookups += lookups
+
+    def admit(self) -> bool:
+        if not self.rate_limit:
+            return True
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.rate_limit, self._tokens + (now - self._updated) * self.rate_limit
+            )
+            self._updated = now
+            if self._tokens < 1:
+                return False
+
+            self._tokens -= 1
+            return True
+
+    def record_bytes(self, n: int):
+        with self._lock:
+            self.bytes_sent += n
+
+    def reset_counters(self):
+        with self._lock:
+            self.calls.clear()
+            self.lookups = 0
+            self.bytes_sent = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def patch_dbtc():
+    """Send dbtc's requests over plain HTTP, with the Metadata API on the same host."""
+    from dbtc.client import base, metadata
+
+    base._Client._base_url = property(lambda self: f'http://{self._host}{self._path}')
+    metadata._MetadataClient._base_url = property(
+        lambda self: f'http://{self._host}{self._path}'
+    )
+    base.rudder_analytics.track = lambda *args, **kwargs: None
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serve a fake dbt Cloud.')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--runs', type=int, default=Sizes.runs)
+    parser.add_argument('--jobs', type=int, default=Sizes.jobs)
+    parser.add_argument('--models', type=int, default=Sizes.models)
+    parser.add_argument('--rate-limit', type=float, help='Requests per second before 429s')
+    args = parser.parse_args()
+    server = FakeCloudServer(
+        FakeCloud(Sizes(runs=args.runs, jobs=args.jobs, models=args.models)),
+        args.port,
+        args.rate_limit,
+    )
+    print(f'Serving fake dbt Cloud on http://{server.host}')
+    server.serve_forever()
@@ -0,0 +1,353 @@
+"""Offline benchmark suite for the dbtc Explorer pages.
+
+Starts a FakeCloudServer, drives Home, Admin API, Metadata API and Analysis
+headlessly with streamlit's ScriptRunner, and records per scenario the script
+rerun latency, API calls made and peak Python memory.  Peak memory is traced
+with tracemalloc, which also slows every scenario down; compare latencies
+between runs made with the same --no-memory setting.  The parameters of every
+explorer method are drawn as well, and a required one whose widget gives no
+value is reported as an error.
+
+    $ python -m benchmarks.harness --runs 2000 --output bench.json
+    $ python -m benchmarks.harness --runs 2000 --baseline bench.json
+
+With --baseline, a comparison table is printed and the exit code is 1 when a
+scenario regressed by more than --threshold (latency, memory) or makes more
+API calls than before.
+"""
+# stdlib
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+from unittest.mock import MagicMock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Keep the run store out of the working tree; must be set before utils is imported
+os.environ.setdefault(
+    'DBTC_STREAMLIT_STORE_DIR', tempfile.mkdtemp(prefix='dbtc-bench-store-')
+)
+
+# third party
+from streamlit import source_util
+from streamlit.proto.ClientState_pb2 import ClientState
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import (
+    MemoryCacheStorageManager,
+)
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.runtime.scriptrunner import RerunData, ScriptRunner, ScriptRunnerEvent
+from streamlit.runtime.state.session_state import SessionState
+from streamlit.runtime.uploaded_file_manager import UploadedFileManager
+
+# first party
+from benchmarks.fake_cloud import FakeCloud, FakeCloudServer, Sizes, patch_dbtc
+
+
+PAGES = {
+    'home': 'Home.py',
+    'admin': os.path.join('pages', '01_🤖_Admin_API.py'),
+    'metadata': os.path.join('pages', '02_🌌_Metadata_API.py'),
+    'analysis': os.path.join('pages', '03_📈_Analysis.py'),
+    'request_log': os.path.join('pages', '04_🔍_Request_Log.py'),
+}
+SERVICE_TOKEN = 'benchmark-token'
+
+
+@dataclass
+class Result:
+    scenario: str
+    latency_s: float
+    api_calls: int
+    graphql_lookups: int
+    bytes_received: int
+    connections_opened: int
+    peak_memory_mb: Optional[float]
+    calls: Dict[str, int] = field(default_factory=dict)
+    errors: List[str] = field(default_factory=list)
+
+
+def run_page(page: str, session_state: SessionState, timeout: float = 600) -> List[str]:
+    """Run one page script to completion against session_state.
+
+    Returns the messages of any exceptions the script rendered.
+    """
+    main_script_path = os.path.join(ROOT, PAGES['home'])
+    script_path = os.path.join(ROOT, PAGES[page])
+    page_script_hash = next(
+        h for h, info in source_util.get_pages(main_script_path).items()
+        if info['script_path'] == script_path
+    )
+    runner = ScriptRunner(
+        session_id='benchmark',
+        main_script_path=main_script_path,
+        client_state=ClientState(),
+        session_state=session_state,
+        uploaded_file_mgr=UploadedFileManager(),
+        initial_rerun_data=RerunData(page_script_hash=page_script_hash),
+        user_info={'email': 'benchmark@example.com'},
+    )
+    errors = []
+    done = threading.Event()
+
+    def on_event(sender, event, **kwargs):
+        if event == ScriptRunnerEvent.ENQUEUE_FORWARD_MSG:
+            msg = kwargs['forward_msg']
+            if (
+                msg.WhichOneof('type') == 'delta'
+                and msg.delta.WhichOneof('type') == 'new_element'
+                and msg.delta.new_element.WhichOneof('type') == 'exception'
+            ):
+                exception = msg.delta.new_element.exception
+                errors.append(f'{exception.type}: {exception.message}')
+        elif event == ScriptRunnerEvent.SCRIPT_STOPPED_WITH_COMPILE_ERROR:
+            errors.append(f'Compile error: {kwargs.get("exception")}')
+        elif event == ScriptRunnerEvent.SHUTDOWN:
+            done.set()
+
+    runner.on_event.connect(on_event, weak=False)
+    runner.start()
+    if not done.wait(timeout):
+        runner.request_stop()
+        raise TimeoutError(f'{page} did not finish within {timeout}s')
+    return errors
+
+
+def _connections_opened() -> int:
+    from utils import client
+
+    return sum(pool['connections'] for pool in client.pool_stats())
+
+
+class Bench:
+    def __init__(self, server: FakeCloudServer, trace_memory: bool = True):
+        self.server = server
+        self.trace_memory = trace_memory
+        self.session_state = SessionState()
+        self.results: List[Result] = []
+
+    def measure(self, scenario: str, page: str, setup: Callable[[SessionState], None] = None):
+        if setup is not None:
+            setup(self.session_state)
+        self.server.reset_counters()
+        connections = _connections_opened()
+        gc.collect()
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        errors = run_page(page, self.session_state)
+        latency = time.perf_counter() - start
+        # Count background prefetch requests with the scenario that started them
+        if 'prefetcher' in self.session_state:
+            self.session_state['prefetcher'].join()
+        peak = None
+        if self.trace_memory:
+            peak = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+            tracemalloc.stop()
+        result = Result(
+            scenario=scenario,
+            latency_s=round(latency, 4),
+            api_calls=sum(self.server.calls.values()),
+            graphql_lookups=self.server.lookups,
+            bytes_received=self.server.bytes_sent,
+            connections_opened=_connections_opened() - connections,
+            peak_memory_mb=round(peak, 2) if peak is not None else None,
+            calls=dict(self.server.calls),
+            errors=errors,
+        )
+        self.results.append(result)
+        return result
+
+
+def check_parameters(bench: Bench, page: str, method_key: str, methods: Dict) -> Result:
+    """Draw the parameters of every method on an explorer page.
+
+    A required parameter whose widget gives None (and has no argument builder
+    that may leave it out) is reported as an error, as it would never be sent.
+    """
+    bench.server.reset_counters()
+    errors = []
+    start = time.perf_counter()
+    for name, method in methods.items():
+        bench.session_state[method_key] = name
+        errors.extend(f'{name}: {e}' for e in run_page(page, bench.session_state))
+        form_params = bench.session_state['form_params']
+        errors.extend(
+            f'{name}: {key} widget returned None'
+            for key, is_required, parameter in method.parameters
+            if is_required and parameter.build is None and form_params.get(key) is None
+        )
+    result = Result(
+        scenario=f'{page}_parameters',
+        latency_s=round(time.perf_counter() - start, 4),
+        api_calls=sum(bench.server.calls.values()),
+        graphql_lookups=bench.server.lookups,
+        bytes_received=bench.server.bytes_sent,
+        connections_opened=0,
+        peak_memory_mb=None,
+        calls=dict(bench.server.calls),
+        errors=errors,
+    )
+    bench.results.append(result)
+    return result
+
+
+def reset_caches(run_store: bool = True):
+    from utils import client
+
+    client._cache.clear()
+    client._schedulers.clear()
+    if not run_store:
+        return
+
+    store_dir = os.environ['DBTC_STREAMLIT_STORE_DIR']
+    for name in os.listdir(store_dir):
+        os.remove(os.path.join(store_dir, name))
+
+
+def run_suite(
+    sizes: Sizes,
+    n_runs: int,
+    trace_memory: bool = True,
+    rate_limit: Optional[float] = None,
+) -> List[Result]:
+    from utils import explorer
+
+    patch_dbtc()
+    mock_runtime = MagicMock(spec=Runtime)
+    mock_runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage('/mock/media'))
+    mock_runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = mock_runtime
+
+    server = FakeCloudServer(FakeCloud(sizes), rate_limit=rate_limit).start()
+    try:
+        reset_caches()
+        bench = Bench(server, trace_memory)
+
+        def login(state):
+            state['dbt_cloud_host'] = server.host
+            state['service_token'] = SERVICE_TOKEN
+
+        def admin(state):
+            state['admin_public_method'] = 'list_runs'
+
+        def metadata(state):
+            state['metadata_public_method'] = 'get_models'
+
+        def analysis(state):
+            state['n_runs'] = n_runs
+            state['prefetch_budget'] = 0
+
+        def analysis_restart(state):
+            # A new session, so only the run store on disk is warm
+            if 'stages' in state:
+                del state['stages']
+
+        def analysis_prefetch(state):
+            state['prefetch_budget'] = 10
+
+        def analysis_top_models(state):
+            state['prefetch_budget'] = 0
+            state['show_top_models'] = True
+
+        bench.measure('home_login', 'home', login)
+        bench.measure('admin_api_cold', 'admin', admin)
+        bench.measure('admin_api_warm', 'admin')
+        bench.measure('metadata_api', 'metadata', metadata)
+        check_parameters(bench, 'admin', 'admin_public_method', explorer.ADMIN_METHODS)
+        check_parameters(bench, 'metadata', 'metadata_public_method', explorer.METADATA_METHODS)
+        admin(bench.session_state)
+        metadata(bench.session_state)
+        bench.measure('analysis_cold', 'analysis', analysis)
+        bench.measure('analysis_warm', 'analysis')
+        reset_caches(run_store=False)
+        bench.measure('analysis_store_only', 'analysis', analysis_restart)
+        bench.measure('analysis_prefetch', 'analysis', analysis_prefetch)
+        bench.measure('analysis_top_models', 'analysis', analysis_top_models)
+        bench.measure('request_log', 'request_log')
+        return bench.results
+    finally:
+        server.stop()
+        Runtime._instance = None
+
+
+METRICS = ('latency_s', 'api_calls', 'peak_memory_mb')
+
+
+def compare(results: List[Dict], baseline: List[Dict], threshold: float) -> bool:
+    """Print a comparison table, returning True if anything regressed."""
+    previous = {r['scenario']: r for r in baseline}
+    regressed = False
+    header = f'{"scenario":<22}' + ''.join(f'{m:>30}' for m in METRICS)
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        before = previous.get(result['scenario'])
+        row = f'{result["scenario"]:<22}'
+        for metric in METRICS:
+            new = result[metric]
+            old = before.get(metric) if before else None
+            if new is None or old is None:
+                row += f'{str(new):>30}'
+                continue
+
+            delta = (new - old) / old if old else 0.0
+            worse = new > old if metric == 'api_calls' else delta > threshold
+            regressed = regressed or worse
+            flag = ' !' if worse else '  '
+            row += f'{f"{old} -> {new} ({delta:+.0%})":>28}{flag}'
+        print(row)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=2000, help='Runs per project in the fake cloud')
+    parser.add_argument('--jobs', type=int, default=Sizes.jobs, help='Jobs per project')
+    parser.add_argument('--models', type=int, default=Sizes.models, help='Models per run')
+    parser.add_argument('--n-runs', type=int, default=1000, help='Analysis page "Number of Runs"')
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    parser.add_argument('--baseline', help='Results JSON from an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed relative slowdown')
+    parser.add_argument('--rate-limit', type=float, help='Fake server requests per second before 429s')
+    parser.add_argument('--no-memory', action='store_true', help='Skip tracemalloc (faster, no peak memory)')
+    args = parser.parse_args()
+
+    sizes = Sizes(runs=args.runs, jobs=args.jobs, models=args.models)
+    results = [asdict(r) for r in run_suite(sizes, args.n_runs, not args.no_memory, args.rate_limit)]
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'sizes': asdict(sizes), 'n_runs': args.n_runs, 'results': results}, f, indent=2)
+
+    failed = False
+    for result in results:
+        if result['errors']:
+            failed = True
+            print(f'{result["scenario"]}: {result["errors"]}', file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        failed = compare(results, baseline, args.threshold) or failed
+    else:
+        for result in results:
+            print(
+                f'{result["scenario"]:<22} {result["latency_s"]:>8.3f}s '
+                f'{result["api_calls"]:>5} calls  {result["peak_memory_mb"]} MB'
+            )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,9 @@
 # stdlib
-import inspect
-import json
+import time
+from typing import Dict
 
 # third party
+import pandas as pd
 import streamlit as st
 
 st.set_page_config(
@@ -11,8 +12,64 @@ st.set_page_config(
 
 # first party
 from utils import client
-from utils import inputs
-from utils.helpers import is_valid_argument, prop_public_methods
+from utils import explorer
+from utils import viewer
+from utils import watcher
+from utils.helpers import is_valid_argument
+
+
+client.begin_rerun('Admin API')
+
+
+def trigger_job(kwargs: Dict):
+    """Trigger a job, handing polling to the shared RunWatcher when asked for."""
+    should_poll = kwargs.pop('should_poll', False)
+    poll_interval = kwargs.pop('poll_interval', watcher.MAX_INTERVAL)
+    data = client.dynamic_request(
+        st.session_state.dbtc_client.cloud,
+        'trigger_job',
+        should_poll=False,
+        **kwargs
+    )
+    if should_poll and data.get('data') is not None:
+        key = watcher.get_watcher().watch(
+            st.session_state.dbtc_client.cloud,
+            kwargs['account_id'],
+            data['data'],
+            max_interval=poll_interval,
+        )
+        st.session_state.setdefault('watched_runs', []).append(key)
+    return data
+
+
+def draw_watched_runs():
+    """Show the latest state of the runs this session triggered."""
+    keys = st.session_state.get('watched_runs', [])
+    if len(keys) == 0:
+        return
+
+    st.subheader('Triggered Runs')
+    watched = watcher.get_watcher().get(keys)
+    now = time.monotonic()
+    st.dataframe(pd.DataFrame([
+        {
+            'run_id': w['run']['id'],
+            'job_id': w['run']['job_definition_id'],
+            'status': w['run']['status_humanized'],
+            'elapsed_s': round((w['finished_at'] or now) - w['watched_at']),
+            'polls': w['polls'],
+            'next_poll_s': (
+                None if w['finished_at'] else round(max(w['next_poll'] - now, 0), 1)
+            ),
+            'error': w['error'],
+            'url': w['run']['href'],
+        }
+        for w in watched
+    ]), use_container_width=True)
+
+    # Polling carries on in the background; a rerun shows its latest state
+    if any(w['finished_at'] is None for w in watched):
+        st.button('Refresh', key='refresh_watched_runs')
 
 
 if 'account_id' not in st.session_state:
@@ -23,144 +80,14 @@ st.write("# Explore the Admin API! 👋")
 
 st.subheader('Select a Method below')
 
-public_methods = prop_public_methods(st.session_state.dbtc_client.cloud)
-
-public_method = st.selectbox('Select Method', options=public_methods, key='admin_public_method')
-
-public_method_api = getattr(st.session_state.dbtc_client.cloud, public_method)
-
-st.help(public_method_api)
-parameters = inspect.signature(public_method_api).parameters
-
-st.session_state.form_params = {}
-for key, parameter in parameters.items():
-    if key == 'account_id':
-        inputs.get_account_widget()
-        st.session_state.form_params['account_id'] = st.session_state.account_id
-    elif key == 'connection_id':
-        connection_id = inputs.get_connection_widget(parameter.default is not None)
-        st.session_state.form_params['connection_id'] = connection_id
-    elif key == 'credentials_id':
-        credentials_id = inputs.get_credential_widget(parameter.default is not None)
-        st.session_state.form_params['credentials_id'] = credentials_id
-    elif key == 'delete_cloned_job':
-        delete_cloned_job = st.checkbox(
-            label='Delete Cloned Job?',
-            value=True,
-            key='delete_cloned_job',
-            help='Indicate whether cloned job should be deleted after completion.',
-        )
-        st.session_state.form_params['delete_cloned_job'] = delete_cloned_job
-    elif key == 'environment_id':
-        environment_id = inputs.get_environment_widget(parameter.default is not None)
-        st.session_state.form_params['environment_id'] = environment_id
-    elif key == 'include_related':
-        include_related = st.text_input(label='Include Related', key='include_related')
-        st.session_state.form_params['include_related'] = include_related
-    elif key == 'group_id':
-        group_id = inputs.get_group_widget(parameter.default is not None)
-        st.session_state.form_params['group_id'] = group_id
-    elif key == 'job_id' or key == 'job_definition_id':
-        job_id = inputs.get_job_widget(parameter.default is not None)
-        st.session_state.form_params[key] = job_id
-    elif key == 'limit':
-        limit = st.number_input(label='Limit', min_value=1, max_value=100, value=100, key='limit')
-        st.session_state.form_params['limit'] = limit
-    elif key == 'logged_at_end':
-        logged_at_end = st.date_input(
-            label='Logged At End',
-            key='logged_at_end',
-        )
-        st.session_state.form_params['logged_at_end'] = logged_at_end
-    elif key == 'logged_at_start':
-        logged_at_start = st.date_input(
-            label='Logged At Start',
-            key='logged_at_start',
-        )
-        st.session_state.form_params['logged_at_start'] = logged_at_start
-    elif key == 'offset':
-        offset = st.number_input(label='Offset', min_value=0, value=0, key='offset')
-        st.session_state.form_params['offset'] = offset
-    elif key == 'order_by':
-        order_by = st.text_input(label='Order By', key='order_by')
-        st.session_state.form_params['order_by'] = order_by
-    elif key == 'path':
-        path = st.text_input(label='Path', key='path')
-        st.session_state.form_params['path'] = path
-    elif key == 'payload':
-        payload = st.text_area(
-            label='Payload',
-            key='payload',
-            help='Payload should be a valid JSON string',
-            placeholder='{"key": "value"}',
-        )
-        if payload != '':
-            st.session_state.form_params['payload'] = json.loads(payload)
-    elif key == 'permission_id':
-        permission_id = st.number_input(label='Permission ID', min_value=1, value=1)
-        st.session_state.form_params['permission_id'] = permission_id
-    elif key == 'poll_interval':
-        poll_interval = st.number_input(
-            label='Poll Interval',
-            min_value=5,
-            value=10,
-            )
-        st.session_state.form_params['poll_interval'] = poll_interval
-    elif key == 'project_id':
-        project_id = inputs.get_project_widget(
-            ['job_id', 'environment_id'], parameter.default is not None
-        )
-        st.session_state.form_params['project_id'] = st.session_state.project_id
-    elif key == 'repository_id':
-        repository_id = st.number_input(label='Repository ID', min_value=1, value=1)
-        st.session_state.form_params['repository_id'] = repository_id
-    elif key == 'run_id':
-        run_id = inputs.get_run_widget()
-        st.session_state.form_params['run_id'] = run_id
-    elif key == 'offset':
-        offset = st.number_input(label='Offset', min_value=0, value=0, key='offset')
-        st.session_state.form_params['offset'] = offset
-    elif key == 'service_token_id':
-        service_token_id = inputs.get_service_token_widget()
-        st.session_state.form_params['service_token_id'] = service_token_id
-    elif key == 'should_poll':
-        should_poll = st.checkbox(
-            label='Should Poll?',
-            value=True,
-            key='should_poll',
-            help='Indicate whether job should poll until completion or not',
-        )
-        st.session_state.form_params['should_poll'] = should_poll
-    elif key == 'status':
-        status = st.multiselect(
-            label='Status',
-            options=['cancelled', 'error', 'queued', 'running', 'starting', 'success'],
-            default=None,
-        )
-        st.session_state.form_params['status'] = status
-    elif key == 'step':
-        step = st.number_input(label='Step', min_value=1, value=4, step=1)
-        st.session_state.form_params['step'] = step
-    elif key == 'trigger_on_failure_only':
-        trigger_on_failure_only = st.checkbox(
-            label='Trigger on Failure Only?',
-            value=True,
-            key='trigger_on_failure_only',
-        )
-        st.session_state.form_params['trigger_on_failure_only'] = \
-            trigger_on_failure_only
-    elif key == 'type':
-        env_type = st.selectbox(
-            label='Select Type',
-            options=[None, 'deployment', 'development'],
-            key='env_type',
-        )
-        st.session_state.form_params['type'] = env_type
-    elif key == 'user_id':
-        user_id = inputs.get_users_widget()
-        st.session_state.form_params['user_id'] = user_id
-    else:
-        pass
+public_method = st.selectbox(
+    'Select Method', options=list(explorer.ADMIN_METHODS), key='admin_public_method'
+)
+
+st.help(getattr(st.session_state.dbtc_client.cloud, public_method))
+st.session_state.form_params = explorer.draw_parameters(
+    explorer.ADMIN_METHODS[public_method]
+)
 
 if public_method.startswith('delete_'):
     st.warning('Delete operations will prompt you to confirm')
@@ -213,11 +140,16 @@ print(data)
                 st.session_state.admin_public_method,
                 **kwargs
             )
-            st.write(data)
+            viewer.put_result('admin_result', public_method, data)
+    elif public_method == 'trigger_job':
+        viewer.put_result('admin_result', public_method, trigger_job(kwargs))
     else:
         data = client.dynamic_request(
             st.session_state.dbtc_client.cloud,
             st.session_state.admin_public_method,
             **kwargs
         )
-        st.write(data)
+        viewer.put_result('admin_result', public_method, data)
+
+viewer.draw_result('admin_result', public_method)
+draw_watched_runs()
@@ -1,26 +1,23 @@
-# stdlib
-import inspect
-import json
-
 # third party
 import streamlit as st
-from dbtc.client import schema
 
 st.set_page_config(
     page_title='dbtc Explorer - Metadata API', page_icon='🌌', layout='centered'
 )
 
+# first party
+from utils import client, explorer, inputs, viewer
+from utils.helpers import is_valid_argument
+
+
+client.begin_rerun('Metadata API')
+
 
 if 'account_id' not in st.session_state:
     st.warning('Go to home page and enter your service token')
     st.stop()
 
 
-# first party
-from utils import client, inputs
-from utils.helpers import is_valid_argument, prop_public_methods
-
-
 st.write("# Explore the Metadata API! 👋")
 
 inputs.get_account_widget()
@@ -28,59 +25,15 @@ inputs.get_project_widget()
 
 st.subheader('Select a Method below')
 
-# Retrieve metadata public methods
-public_methods = prop_public_methods(st.session_state.dbtc_client.metadata)
-public_method = st.selectbox('Select Method', options=public_methods, key='metadata_public_method')
-public_method_api = getattr(st.session_state.dbtc_client.metadata, public_method)
-st.help(public_method_api)
-
-# Iterate through parameters of selected function, creating widgets
-parameters = inspect.signature(public_method_api).parameters
-st.session_state.form_params = {}
-for key, parameter in parameters.items():
-    if key == 'database':
-        database = st.text_input(label='Database', key='database')
-        st.session_state.form_params['database'] = database
-    elif key == 'environment_id':
-        environment_id = inputs.get_environment_widget(parameter.default is not None)
-        st.session_state.form_params['environment_id'] = environment_id
-    elif key == 'identifier':
-        identifier = st.text_input(label='Identifier', key='identifier')
-        st.session_state.form_params['identifier'] = identifier
-    elif key == 'job_id' or key == 'job_definition_id':
-        job_id = inputs.get_job_widget(parameter.default is not None)
-        st.session_state.form_params[key] = job_id
-    elif key == 'last_run_count':
-        last_run_count = st.number_input(
-            label='Last Run Count',
-            min_value=1,
-            max_value=10,
-            value=10,
-            key='last_run_count'
-        )
-        st.session_state.form_params['last_run_count'] = last_run_count
-    elif key == 'name':
-        name = st.text_input(label='Name', key='name')
-        st.session_state.form_params['name'] = name
-    elif key == 'run_id':
-        run_id = inputs.get_run_widget()
-        st.session_state.form_params['run_id'] = run_id
-    elif key == 'schema':
-        schema = st.text_input(label='Schema', key='schema')
-        st.session_state.form_params['schema'] = schema
-    elif key == 'unique_id':
-        unique_id = st.text_input(label='Unique ID', key='unique_id')
-        st.session_state.form_params['unique_id'] = unique_id
-    elif key == 'with_catalog':
-        with_catalog = st.checkbox(
-            label='With Catalog?',
-            value=False,
-            key='with_catalog',
-            help='Return only runs that have catalog information',
-        )
-        st.session_state.form_params['with_catalog'] = with_catalog
-    else:
-        pass
+public_method = st.selectbox(
+    'Select Method', options=list(explorer.METADATA_METHODS), key='metadata_public_method'
+)
+st.help(getattr(st.session_state.dbtc_client.metadata, public_method))
+
+# Draw the widgets of the selected method's parameters
+st.session_state.form_params = explorer.draw_parameters(
+    explorer.METADATA_METHODS[public_method]
+)
 
 submitted = st.button('Make Request')
 
@@ -121,4 +74,6 @@ print(data)
         public_method,
         **kwargs
     )
-    st.write(data)
+    viewer.put_result('metadata_result', public_method, data)
+
+viewer.draw_result('metadata_result', public_method)
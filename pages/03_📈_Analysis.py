@@ -1,9 +1,12 @@
 # stdlib
+import itertools
+import time
 from datetime import datetime, timezone
-from typing import Dict, List
+from typing import Dict, Iterator, List, Tuple
 
 # third party
 import altair as alt
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import streamlit as st
@@ -21,28 +24,47 @@ st.set_page_config(
     page_title='dbtc Explorer - Analysis', page_icon='📈', layout='wide'
 )
 
+# first party
+from utils import client
+
+
+client.begin_rerun('Analysis')
+
 if 'account_id' not in st.session_state:
     st.warning('Go to home page and enter your service token')
     st.stop()
 
 # first party
-from utils import client
+from utils import artifacts
 from utils import inputs
+from utils import job_stats
+from utils import metadata
+from utils import prefetch
+from utils import runs
+from utils import stages
+from utils import store
+from utils import top_models
 from utils.helpers import URLS
 
 
-DATETIME_COLUMNS = [
-    'created_at',
-    'updated_at',
-    'dequeued_at',
-    'started_at',
-    'finished_at',
-    'should_start_at',
-    'last_checked_at',
-    'last_heartbeat_at',
-]
 ABOVE_BELOW_RUNS = 3
+FETCH_CONCURRENCY = 4
 OVERRIDE_HEIGHT = 600
+OUTLIER_STATUSES = ['Error', 'Cancelled']
+RUN_CHART_MAX_POINTS = 1000
+TOP_MODELS = 5
+CI_TRIGGERS = ['github_webhook', 'git_provider_webhook']
+GANTT_FIELDS = [
+    'name',
+    'executionTime',
+    'executeStartedAt',
+    'executeCompletedAt',
+    'status',
+    'threadId',
+    'uniqueId',
+    'runId',
+]
+UPDATE_INTERVAL = 0.5  # seconds between redraws while runs are loading
 
 
 def _set_color(x):
@@ -56,84 +78,59 @@ def _set_color(x):
     return color
 
 
-def _enhance_df(df: pd.DataFrame):
-    
-    # Convert to minutes
-    df['duration_m'] = df['duration'].apply(get_minutes)
-    df['queued_duration_m'] = df['queued_duration'].apply(get_minutes)
-    df['run_duration_m'] = df['run_duration'].apply(get_minutes)
-    
-    # Convert datetime columns
-    df[DATETIME_COLUMNS] = df[DATETIME_COLUMNS].apply(
-        pd.to_datetime
-    )
-    df['created_at'] = df['created_at'].dt.strftime('%Y-%m-%d %H:%M:%S')
-    
-    # Additional transformations
-    df['run_duration_m_avg'] = df['run_duration_m'].mean()
-    df['queued_duration_m_avg'] = df['queued_duration_m'].mean()
-    return df
-
-
-def get_minutes(time_str: str):
-    h, m, s = time_str.split(':')
-    return round(int(h) * 60 + int(m) + (int(s) / 60), 1)
-
+def get_job_runs(env_runs_df: pd.DataFrame) -> pd.DataFrame:
+    """The selected job's latest runs, from env_runs_df where it has them.
 
-def get_all_runs(**kwargs):
-    all_data = []
-    for OFFSET in range(0, st.session_state.n_runs, 100):
-        data = client.dynamic_request(
+    Only runs older than the environment's oldest are read from the job's run
+    store, which requests those it doesn't have.
+    """
+    job_df, missing = runs.select_job_runs(
+        env_runs_df, st.session_state.job_id, st.session_state.n_runs
+    )
+    frames = [job_df]
+    if missing > 0:
+        older = store.older_runs(
             st.session_state.dbtc_client.cloud,
-            'list_runs',
             st.session_state.account_id,
-            offset=OFFSET,
-            limit=100,
-            order_by='-id',
-            **kwargs,
-        ).get('data', [])
-        if len(data) == 0:
-            break
-        
-        all_data.extend(data)
-    df = pd.DataFrame(all_data)
-    return _enhance_df(df)
+            int(env_runs_df['id'].min()),
+            missing,
+            offset=len(job_df),
+            concurrency=st.session_state.get('fetch_concurrency', FETCH_CONCURRENCY),
+            job_definition_id=st.session_state.job_id,
+            include_related=['job'],
+        )
+        if older:
+            frames.append(runs.enhance_df(runs.runs_to_frame(older)))
+    return runs.concat_frames(frames)
+
+
+def iter_all_runs(**kwargs) -> Iterator[Tuple[pd.DataFrame, bool]]:
+    """Yield frames of the latest n_runs runs matching kwargs as pages arrive.
 
+    Yields (df, done).  Partial frames are yielded at most every UPDATE_INTERVAL
+    seconds, and the last frame yielded (with done True) has every run.
+    """
+    last_update = 0.0
+    all_data = None
+    for all_data in store.iter_runs(
+        st.session_state.dbtc_client.cloud,
+        st.session_state.account_id,
+        st.session_state.n_runs,
+        concurrency=st.session_state.get('fetch_concurrency', FETCH_CONCURRENCY),
+        **kwargs,
+    ):
+        if all_data and time.perf_counter() - last_update >= UPDATE_INTERVAL:
+            yield runs.enhance_df(runs.runs_to_frame(all_data)), False
+            last_update = time.perf_counter()
 
+    yield runs.enhance_df(runs.runs_to_frame(all_data)), True
 
 
 def get_env_runs_stats(df: pd.DataFrame):
-    df['job_name'] = df['job'].apply(lambda x: x.get('name'))
-    df['is_success'] = df['status_humanized'] == 'Success'
-    df = df.groupby('job_name').agg(
-        avg_runtime=('run_duration_m', 'mean'),
-        total_runs=('id', 'count'),
-        total_success=('is_success', 'sum'),
-        last_run=('started_at', 'max'),
-        last_runtime=('run_duration_m', 'first'),
-        std_runtime=('run_duration_m', 'std'),
-        max_runtime=('run_duration_m', 'max'),
-        account_id=('account_id', 'mean'),
-        project_id=('project_id', 'mean'),
-        job_id=('job_definition_id', 'mean'),
-    )
-    df['success_rate'] = round(df['total_success'] / df['total_runs'] * 100, 2)
-    df['url'] = df.apply(lambda x: f'https://cloud.getdbt.com/deploy/{int(x.account_id)}/projects/{int(x.project_id)}/jobs/{int(x.job_id)}', axis=1)
-    df['last_run'] = df['last_run'].dt.strftime('%Y-%m-%d %H:%M:%S')
-    cols = ['avg_runtime', 'last_runtime', 'std_runtime', 'max_runtime']
-    df[cols] = df[cols].round(1)
-    return df[[
-        'total_runs',
-        'total_success',
-        'success_rate',
-        'last_run',
-        'last_runtime',
-        'avg_runtime',
-        'max_runtime',
-        'std_runtime',
-        'url',
-        'job_id',
-    ]]
+    # Only runs that changed since the last rerun are folded into the stats
+    if 'job_stats_aggregator' not in st.session_state:
+        st.session_state.job_stats_aggregator = job_stats.JobStatsAggregator()
+    return st.session_state.job_stats_aggregator.update(df)
     
     
 def get_aggregate_stats(df: pd.DataFrame):
@@ -148,7 +145,33 @@ def get_aggregate_stats(df: pd.DataFrame):
     }
     
 
+def sample_runs(runs_df: pd.DataFrame, max_points: int = RUN_CHART_MAX_POINTS):
+    """Positions of the runs to plot: all of them, or an LTTB sample of the
+    durations plus every failed and cancelled run."""
+    if len(runs_df) <= max_points:
+        return np.arange(len(runs_df))
+
+    started_at = runs_df['started_at'].ffill().bfill()
+    kept = runs.lttb_indices(
+        started_at.astype('int64').to_numpy() / 1e9,
+        runs_df['run_duration_m'].to_numpy(),
+        max_points,
+    )
+    outliers = np.flatnonzero(
+        runs_df['status_humanized'].isin(OUTLIER_STATUSES).to_numpy()
+    )
+    return np.union1d(kept, outliers)
+
+
 def build_last_n_runs_chart(runs_df: pd.DataFrame):
+    """The run duration chart, and the runs_df position of each of its points.
+
+    Above RUN_CHART_MAX_POINTS runs the chart is downsampled and drawn with
+    WebGL, so plotly_events point numbers must be looked up in the positions.
+    """
+    positions = sample_runs(runs_df)
+    plot_df = runs_df.iloc[positions]
+    render_mode = 'webgl' if len(runs_df) > RUN_CHART_MAX_POINTS else 'svg'
 
     # Get job URL
     job_url = URLS['job'].format(**{
@@ -157,16 +180,20 @@ def build_last_n_runs_chart(runs_df: pd.DataFrame):
         'job_id': st.session_state.job_id,
     })
     job = st.session_state.jobs[st.session_state.job_id]['name']
+    title = f'Last {st.session_state.n_runs} Runs - <a href="{job_url}">{job}</a>'
+    if len(plot_df) < len(runs_df):
+        title += f' ({len(plot_df)} of {len(runs_df)} shown)'
 
     # Create line chart for runs
     runs_fig = px.line(
-        runs_df,
+        plot_df,
         x='started_at',
         y='run_duration_m',
         hover_data={'id': False, 'status_humanized': True},
         hover_name='id',
         markers=True,
-        title=f'Last {st.session_state.n_runs} Runs - <a href="{job_url}">{job}</a>',
+        title=title,
+        render_mode=render_mode,
     ).update_layout(
         title_x=0.5,
         xaxis_title='Date',
@@ -176,54 +203,113 @@ def build_last_n_runs_chart(runs_df: pd.DataFrame):
         marker=dict(
             color='white',
             line=dict(
-                color=list(map(_set_color, runs_df['status_humanized'])),
+                color=list(map(_set_color, plot_df['status_humanized'])),
                 width=3,
             ),
             
         ),       
     )
     avg = px.line(
-        runs_df,
+        plot_df,
         x='started_at',
         y='run_duration_m_avg',
+        render_mode=render_mode,
     ).update_traces(
         line_color='red', line_dash='dash'
     )
     runs_fig.add_traces(avg.data)
-    return runs_fig
-
-
-def build_gantt_chart(runs_df: pd.DataFrame, selected_run: List[Dict]):
-    kwargs = {'fields': [
-        'name',
-        'executionTime',
-        'executeStartedAt',
-        'executeCompletedAt',
-        'status',
-        'threadId',
-        'uniqueId',
-    ]}
-    if selected_run:
-        idx = selected_run[0]['pointNumber']
-        run_id = runs_df.loc[idx]['id']
-    else:
-        run_id = runs_df.loc[0]['id']
+    return runs_fig, positions
+
+
+def get_selected_run_index(selected_run: List[Dict], positions: np.ndarray) -> int:
+    """The runs_df position of the clicked point, or 0 (the latest run)."""
+    if not selected_run:
+        return 0
+
+    return int(positions[selected_run[0]['pointNumber']])
+
+
+def _get_run_models(
+    admin_client, metadata_client, account_id: int, job_id: int, run_id: int
+) -> List[Dict]:
+    # run_results.json has every model's timing in one request; the Metadata API
+    # covers runs whose artifacts aren't available
+    models = artifacts.get_run_timings(admin_client, account_id, run_id)
+    if models is not None:
+        return models
+
+    response = client.dynamic_request(
+        metadata_client, 'get_models', job_id, fields=GANTT_FIELDS, run_id=int(run_id)
+    )
+    return (response.get('data') or {}).get('models') or []
+
+
+def prefetch_gantt_data(runs_df: pd.DataFrame, run_index: int):
+    """Warm the cache with model timings for runs likely to be clicked next.
+
+    Takes the selected run's neighbors, nearest first, and the latest runs in
+    turn.  Work queued for a previously selected job is cancelled.
+    """
+    budget = st.session_state.get('prefetch_budget', prefetch.BUDGET)
+    if budget <= 0 or len(runs_df) == 0:
+        return
+
+    # Alternate between the nearest neighbors and the latest runs
+    neighbors = (
+        i for distance in range(1, len(runs_df))
+        for i in (run_index - distance, run_index + distance)
+        if 0 <= i < len(runs_df)
+    )
+    latest = iter(range(len(runs_df)))
+    run_ids = []
+    for idx in itertools.chain.from_iterable(itertools.zip_longest(neighbors, latest)):
+        if len(run_ids) >= budget:
+            break
+        if idx is None or idx == run_index:
+            continue
+
+        run_id = int(runs_df.iloc[idx]['id'])
+        if run_id not in run_ids:
+            run_ids.append(run_id)
+
+    admin_client = st.session_state.dbtc_client.cloud
+    metadata_client = st.session_state.dbtc_client.metadata
+    account_id = st.session_state.account_id
+    job_id = st.session_state.job_id
+    prefetch.get_prefetcher().schedule(
+        job_id,
+        [
+            (('gantt', run_id), lambda run_id=run_id: _get_run_models(
+                admin_client, metadata_client, account_id, job_id, run_id
+            ))
+            for run_id in run_ids
+        ],
+        budget,
+    )
+
+
+def build_gantt_chart(runs_df: pd.DataFrame, run_index: int):
+    """The Gantt chart for a run, its models and a message when it has none."""
+    run_id = runs_df.loc[run_index]['id']
     url = URLS['run'].format(**{
         'account_id': st.session_state.account_id,
         'project_id': st.session_state.project_id,
         'run_id': run_id,
     })
-    kwargs['run_id'] = int(run_id)
-    models = client.dynamic_request(
+
+    # Answered from the cache if it was prefetched, or once a running prefetch
+    # finishes (within prefetch.WAIT_TIMEOUT)
+    prefetch.get_prefetcher().wait(('gantt', int(run_id)))
+    models = _get_run_models(
+        st.session_state.dbtc_client.cloud,
         st.session_state.dbtc_client.metadata,
-        'get_models',
+        st.session_state.account_id,
         st.session_state.job_id,
-        **kwargs
-    ).get('data', {}).get('models', [])
+        run_id,
+    )
     models = [m for m in models if m['threadId'] is not None]
     if len(models) == 0:
-        st.info(f'No model timing info for run [{run_id}]({url})')
-        return None, pd.DataFrame([])
+        return None, pd.DataFrame([]), f'No model timing info for run [{run_id}]({url})'
     
     df = pd.DataFrame(models)
     GANTT_DATETIME_COLS = ['executeStartedAt', 'executeCompletedAt']
@@ -245,35 +331,49 @@ def build_gantt_chart(runs_df: pd.DataFrame, selected_run: List[Dict]):
         title=f'Model Timing - <a href="{url}">{run_id}</a>',
         hover_name='name',
     ).update_layout(title_x=0.5, hovermode='closest')
-    return fig, df
-
-
-def get_all_model_runs(run_ids: List[int]):
-    data = []
-    progress_bar = st.progress(0)
-    total_run_ids = len(run_ids)
-    for i, run_id in enumerate(run_ids):
-        models = client.dynamic_request(
-            st.session_state.dbtc_client.metadata,
-            'get_models',
-            job_id=st.session_state.job_id,
-            run_id=run_id,
-            fields=[
-                'executeStartedAt',
-                'executionTime',
-                'status',
-                'runId',
-                'name',
-            ]
-        ).get('data', {}).get('models', [])
-        data.extend(models)
-        progress_bar.progress((i + 1) / total_run_ids)
-    return pd.DataFrame(data)
-
-
-def build_all_model_timing_chart(df, top_n: int = 5):
-    top = df.groupby('name')['executionTime'].sum().nlargest(top_n)
-    df = df[df['name'].isin(top.index)]
+    return fig, df, None
+
+
+def iter_top_model_runs(
+    run_ids: List[int], top_n: int = TOP_MODELS
+) -> Iterator[Tuple[pd.DataFrame, bool]]:
+    """Yield the top_n models' timings over run_ids, by total execution time.
+
+    Runs are read a few at a time and folded into running totals, so only the
+    current top models' points are held.  Yields (df, done) like iter_all_runs.
+    """
+    admin_client = st.session_state.dbtc_client.cloud
+    metadata_client = st.session_state.dbtc_client.metadata
+    account_id = st.session_state.account_id
+    job_id = st.session_state.job_id
+    concurrency = st.session_state.get('fetch_concurrency', FETCH_CONCURRENCY)
+
+    def get_models(run_id: int) -> List[Dict]:
+        return _get_run_models(admin_client, metadata_client, account_id, job_id, run_id)
+
+    last_update = time.perf_counter()
+    models = top_models.TopModels(top_n)
+    for start in range(0, len(run_ids), concurrency):
+        chunk = run_ids[start:start + concurrency]
+        for run_models in client.map_concurrently(get_models, chunk, concurrency):
+            models.update(run_models)
+        if time.perf_counter() - last_update >= UPDATE_INTERVAL:
+            yield models.to_frame(), False
+            last_update = time.perf_counter()
+
+    # Models that made the top n after the first run are missing earlier points
+    incomplete = models.incomplete()
+    for start in range(0, incomplete, concurrency):
+        chunk = run_ids[start:min(start + concurrency, incomplete)]
+        for index, run_models in enumerate(
+            client.map_concurrently(get_models, chunk, concurrency), start
+        ):
+            models.backfill(index, run_models)
+
+    yield models.to_frame(), True
+
+
+def build_all_model_timing_chart(df, top_n: int = TOP_MODELS):
     fig = px.line(
         df,
         x='executeStartedAt',
@@ -286,59 +386,83 @@ def build_all_model_timing_chart(df, top_n: int = 5):
     return fig
 
 
-def get_intersections():
-    def model_in_job(job_name, model_name):
-        return model_name in job_models[job_name]
-    
-    job_models = {}
-    for job_id, job_definition in st.session_state.jobs.items():
-        is_ci_job = any([job_definition['triggers'][x] for x in ['github_webhook', 'git_provider_webhook']])
-        if not False:
-            data = client.dynamic_request(
-                st.session_state.dbtc_client.metadata,
-                'get_models',
-                job_id,
-                fields=['runGeneratedAt', 'name']
-            )['data']
-            if data is not None:
-                job_models[job_definition['name']] = [
-                    m['name'] for m in data['models'] if m['runGeneratedAt'] is not None
-                ]
-                
-    df = pd.DataFrame(columns=job_models.keys(), index=list(set(
-        [m for job in job_models.values() for m in job]
-    )))
-    df = df.apply(lambda x: pd.DataFrame(x).apply(lambda y: model_in_job(x.name, y.name), axis=1))*1
-    df['total_jobs'] = df.iloc[:].sum(axis=1)
-    df = df.loc[df['total_jobs'] > 1].sort_index().iloc[:, :-1].T
-    return df
+def get_intersections(include_ci_jobs: bool = True) -> pd.DataFrame:
+    """Jobs by the models that more than one job builds, 1 where a job builds a model."""
+    jobs = [
+        (job_id, job) for job_id, job in st.session_state.jobs.items()
+        if include_ci_jobs or not any([
+            (job.get('triggers') or {}).get(x) for x in CI_TRIGGERS
+        ])
+    ]
+    jobs_models = metadata.batch_request(
+        st.session_state.dbtc_client.metadata,
+        'models',
+        [{'job_id': job_id} for job_id, _ in jobs],
+        fields=['runGeneratedAt', 'name'],
+        concurrency=FETCH_CONCURRENCY,
+    )
+    job_models: Dict[str, set] = {}
+    for (_, job), models in zip(jobs, jobs_models):
+        if models is not None:
+            job_models[job['name']] = {
+                m['name'] for m in models if m['runGeneratedAt'] is not None
+            }
+
+    pairs = [(job, model) for job, models in job_models.items() for model in models]
+    job_codes = pd.Index(list(job_models.keys()))
+    model_codes, model_names = pd.factorize([model for _, model in pairs])
+    matrix = np.zeros((len(job_codes), len(model_names)), dtype='int64')
+    matrix[job_codes.get_indexer([job for job, _ in pairs]), model_codes] = 1
+    df = pd.DataFrame(matrix, index=job_codes, columns=model_names)
+    shared = df.columns[df.sum() > 1]
+    return df[sorted(shared)]
 
 
 def get_model_timing_data(unique_id: str, run_ids: List[int]):
-    data = []
     progress_bar = st.progress(0)
-    total_run_ids = len(run_ids)
-    for i, run_id in enumerate(run_ids):
-        model = client.dynamic_request(
-            st.session_state.dbtc_client.metadata,
-            'get_model',
-            job_id=st.session_state.job_id,
-            run_id=run_id,
-            unique_id=unique_id,
-            fields=[
-                'executeStartedAt',
-                'executionTime',
-                'status',
-                'runId',
-                'rawSql',
-                'compiledSql',
-            ]
-        ).get('data', {}).get('model', {})
-        if model is None:
-            model = {}
-        data.append(model)
-        progress_bar.progress((i + 1) / total_run_ids)
-    return pd.DataFrame(data)
+    admin_client = st.session_state.dbtc_client.cloud
+    runs_models = client.map_concurrently(
+        lambda run_id: artifacts.get_run_timings(
+            admin_client, st.session_state.account_id, run_id
+        ),
+        run_ids,
+        FETCH_CONCURRENCY,
+    )
+    data = {
+        run_id: next((m for m in models if m['uniqueId'] == unique_id), None)
+        for run_id, models in zip(run_ids, runs_models) if models is not None
+    }
+    loaded = len(data) / max(len(run_ids), 1)
+    progress_bar.progress(loaded)
+
+    # Runs without artifacts are looked up in the Metadata API, filling in the
+    # rest of the progress bar
+    missing = [run_id for run_id in run_ids if run_id not in data]
+    models = metadata.batch_request(
+        st.session_state.dbtc_client.metadata,
+        'model',
+        [
+            {
+                'job_id': st.session_state.job_id,
+                'run_id': run_id,
+                'unique_id': unique_id,
+            }
+            for run_id in missing
+        ],
+        fields=[
+            'executeStartedAt',
+            'executionTime',
+            'status',
+            'runId',
+        ],
+        on_progress=lambda done: progress_bar.progress(loaded + done * (1 - loaded)),
+    )
+    data.update(zip(missing, models))
+    progress_bar.progress(1.0)
+    df = pd.DataFrame([data[run_id] or {} for run_id in run_ids])
+    if 'executeStartedAt' in df.columns:
+        df['executeStartedAt'] = df['executeStartedAt'].apply(pd.to_datetime)
+    return df
 
 
 def build_model_timing_chart(df: pd.DataFrame, unique_id: str):
@@ -364,14 +488,23 @@ def build_model_timing_chart(df: pd.DataFrame, unique_id: str):
     return fig
 
         
-def get_sql(model_df: pd.DataFrame, run_id: int):
+def get_sql(unique_id: str, run_id: int):
     st.subheader('View SQL')
-    row = model_df[model_df['runId'] == run_id].iloc[0]
+    model = metadata.batch_request(
+        st.session_state.dbtc_client.metadata,
+        'model',
+        [{'job_id': st.session_state.job_id, 'run_id': int(run_id), 'unique_id': unique_id}],
+        fields=['rawSql', 'compiledSql'],
+    )[0]
+    if model is None:
+        st.info(f'No SQL for {unique_id} in run {int(run_id)}')
+        return
+    
     tab1, tab2 = st.tabs(['Raw', 'Compiled'])
     with tab1:
-        st.code(row['rawSql'])
+        st.code(model['rawSql'])
     with tab2:
-        st.code(row['compiledSql'])
+        st.code(model['compiledSql'])
     
 
 st.write('# Analyze Historical Performance')
@@ -398,34 +531,55 @@ st.markdown(f'<style>{css}</style>', unsafe_allow_html=True)
 inputs.get_account_widget()
 inputs.get_project_widget()
 inputs.get_environment_widget(type='deployment')
-runs = st.number_input(
+st.number_input(
     label='Number of Runs',
     min_value=100,
     max_value=10000,
     step=100,
     key='n_runs'
 )
+st.number_input(
+    label='Concurrent Requests',
+    min_value=1,
+    max_value=10,
+    value=FETCH_CONCURRENCY,
+    step=1,
+    key='fetch_concurrency',
+    help='Number of pages of runs requested at once.  Lower this if dbt Cloud '
+    'starts rate limiting requests.',
+)
+st.number_input(
+    label='Prefetch Runs',
+    min_value=0,
+    max_value=50,
+    value=prefetch.BUDGET,
+    step=1,
+    key='prefetch_budget',
+    help='Number of runs whose model timing is loaded in the background, '
+    'around the selected run, so clicking them is faster.  0 turns this off.',
+)
+
+
+def refresh_runs():
+    st.session_state.runs_refreshes = st.session_state.get('runs_refreshes', 0) + 1
+
+
+st.button(
+    'Refresh Runs',
+    on_click=refresh_runs,
+    help="Sync the environment's latest runs from dbt Cloud.",
+)
 
 if len(st.session_state.environments.keys()) > 0:
     
     selected_model: List[Dict] = None
     
-    # All runs for specific environment
-    env_runs_df = get_all_runs(
-        environment_id=st.session_state.environment_id,
-        include_related=['job'],
-    )
-    
-    env_runs_df_xf = get_env_runs_stats(env_runs_df).reset_index()
-    
-    # Aggregating stats from xf df
-    agg_stats = get_aggregate_stats(env_runs_df_xf)
-    
-    # Create metrics
+    # Metrics and per-job stats refine as the environment's runs load
     col1, col2, col3 = st.columns(3)
-    col1.metric('Success Rate', f'{round(agg_stats["success_rate"] * 100, 2)}%')
-    col2.metric('Completed Runs', agg_stats['completed_runs'])
-    col3.metric('Longest Runtime (mins)', agg_stats['max_runtime'])
+    success_rate_tile, completed_runs_tile, max_runtime_tile = (
+        col1.empty(), col2.empty(), col3.empty()
+    )
+    stats_table = st.empty()
     
     # Create table for aggregate stats
     xf_formatter = {
@@ -441,43 +595,142 @@ if len(st.session_state.environments.keys()) > 0:
         'std_runtime': ('Std', {'width': 75}),
     }
 
-    xf_grid = agstyler.draw_grid(
-        env_runs_df_xf,
-        formatter=xf_formatter,
-        selection=None,
+    def draw_metrics(agg_stats: Dict):
+        success_rate_tile.metric('Success Rate', f'{round(agg_stats["success_rate"] * 100, 2)}%')
+        completed_runs_tile.metric('Completed Runs', agg_stats['completed_runs'])
+        max_runtime_tile.metric('Longest Runtime (mins)', agg_stats['max_runtime'])
+
+    def get_stats(env_runs_df: pd.DataFrame):
+        env_runs_df_xf = get_env_runs_stats(env_runs_df).reset_index()
+        
+        # Aggregating stats from xf df
+        return env_runs_df_xf, get_aggregate_stats(env_runs_df_xf)
+
+    # Fetch and enhance: all runs for specific environment, synced again only
+    # when what's fetched changes or Refresh Runs is clicked, so clicks on the
+    # charts don't recompute everything downstream
+    env_key = (
+        st.session_state.account_id,
+        st.session_state.environment_id,
+        st.session_state.n_runs,
+        st.session_state.get('runs_refreshes', 0),
+    )
+    hit, env_runs_df = stages.get('env_runs', env_key)
+    if not hit:
+        for env_runs_df, done in iter_all_runs(
+            environment_id=st.session_state.environment_id,
+            include_related=['job'],
+        ):
+            if not done:
+                # The grid is a component, which can only be drawn once per rerun
+                env_runs_df_xf, agg_stats = get_stats(env_runs_df)
+                draw_metrics(agg_stats)
+                with stats_table.container():
+                    st.caption(f'Loading runs... {len(env_runs_df)} of {st.session_state.n_runs}')
+                    st.dataframe(
+                        env_runs_df_xf[list(xf_formatter)],
+                        use_container_width=True,
+                    )
+        stages.put('env_runs', env_key, env_runs_df, runs.frame_digest(env_runs_df))
+
+    # Aggregate
+    env_runs_df_xf, agg_stats = stages.run(
+        'env_stats', stages.version('env_runs'), lambda: get_stats(env_runs_df)
     )
+    draw_metrics(agg_stats)
+    with stats_table.container():
+        xf_grid = agstyler.draw_grid(
+            env_runs_df_xf,
+            formatter=xf_formatter,
+            selection=None,
+            columns=[*xf_formatter, 'url'],
+            page_size=agstyler.PAGE_SIZE,
+            key='job_stats',
+        )
 
     inputs.get_job_widget(environment_id=st.session_state.environment_id)
     
-    runs_df = get_all_runs(
-        job_definition_id=st.session_state.job_id,
-        include_related=['job']
+    runs_df = stages.run(
+        'job_runs',
+        (stages.version('env_runs'), st.session_state.job_id, st.session_state.n_runs),
+        lambda: get_job_runs(env_runs_df),
     )
     
     # Create line chart for last N runs
-    runs_fig = build_last_n_runs_chart(runs_df)
+    runs_fig, run_positions = stages.run(
+        'run_chart',
+        (stages.version('job_runs'), st.session_state.project_id),
+        lambda: build_last_n_runs_chart(runs_df),
+    )
     selected_run = plotly_events(runs_fig, override_height=OVERRIDE_HEIGHT)
+    run_index = get_selected_run_index(selected_run, run_positions)
+    prefetch_gantt_data(runs_df, run_index)
     
-    # Grab top model runs over same time period
-    # run_ids = runs_df['id'].tolist()
-    # model_runs_df = get_all_model_runs(run_ids)
-    # model_runs_fig = build_all_model_timing_chart(model_runs_df)
+    # Top models over the job's runs
+    if st.checkbox(
+        'Show Top Models',
+        key='show_top_models',
+        help=f'Chart the {TOP_MODELS} models with the longest total execution '
+        'time over every run of the job.  Loads the model timing of each run.',
+    ):
+        top_models_chart = st.empty()
+        top_models_key = (stages.version('job_runs'), TOP_MODELS)
+        hit, model_runs_df = stages.get('top_models', top_models_key)
+        if not hit:
+            for model_runs_df, done in iter_top_model_runs(runs_df['id'].tolist()):
+                if not done:
+                    top_models_chart.plotly_chart(
+                        build_all_model_timing_chart(model_runs_df),
+                        use_container_width=True,
+                    )
+            stages.put('top_models', top_models_key, model_runs_df)
+        model_runs_fig = stages.run(
+            'top_models_chart',
+            stages.version('top_models'),
+            lambda: build_all_model_timing_chart(model_runs_df),
+        )
+        top_models_chart.plotly_chart(model_runs_fig, use_container_width=True)
     
-    # All Model Timing Chart
-    # selected_model_run = plotly_events(model_runs_fig, override_height=OVERRIDE_HEIGHT)
+    # Models built by more than one of the environment's jobs
+    if st.checkbox(
+        'Show Shared Models',
+        key='show_shared_models',
+        help='List the models that more than one job in the environment builds.  '
+        'Looks up the latest models of every job.',
+    ):
+        include_ci_jobs = st.checkbox(
+            'Include CI Jobs', value=True, key='include_ci_jobs'
+        )
+        intersections_df = stages.run(
+            'intersections',
+            (
+                st.session_state.account_id,
+                st.session_state.environment_id,
+                tuple(st.session_state.jobs),
+                include_ci_jobs,
+            ),
+            lambda: get_intersections(include_ci_jobs),
+        )
+        if intersections_df.empty:
+            st.info('No model is built by more than one job')
+        else:
+            st.dataframe(intersections_df, use_container_width=True)
     
     # Model Timing chart
-    model_timing_fig, models_df = build_gantt_chart(runs_df, selected_run)
+    model_timing_fig, models_df, message = stages.run(
+        'gantt_chart',
+        (stages.version('job_runs'), st.session_state.project_id, run_index),
+        lambda: build_gantt_chart(runs_df, run_index),
+    )
+    if message is not None:
+        st.info(message)
     
     if model_timing_fig is not None:
         selected_model = plotly_events(model_timing_fig, override_height=OVERRIDE_HEIGHT)
         
+    # Drilldown
     if selected_model:
         unique_id = models_df.loc[selected_model[0]['pointNumber']]['uniqueId']
-        try:
-            run_index = selected_run[0]['pointNumber']
-        except IndexError:
-            run_index = 0
         above_below = st.number_input(
             label='+/- Runs',
             min_value=ABOVE_BELOW_RUNS,
@@ -489,17 +742,20 @@ if len(st.session_state.environments.keys()) > 0:
         max_idx = min(run_index + st.session_state.above_below_runs, len(runs_df))
         run_ids = runs_df.iloc[min_idx:max_idx]['id'].tolist()
         
-        model_df = get_model_timing_data(unique_id, run_ids)
-        try:
-            model_df['executeStartedAt'] = model_df['executeStartedAt'].apply(pd.to_datetime)
-        except KeyError:
-            pass
-        else:
-            model_fig = build_model_timing_chart(model_df, unique_id)
+        model_key = (st.session_state.job_id, unique_id, tuple(run_ids))
+        model_df = stages.run(
+            'model_timing', model_key, lambda: get_model_timing_data(unique_id, run_ids)
+        )
+        if 'executeStartedAt' in model_df.columns:
+            model_fig = stages.run(
+                'model_chart',
+                (stages.version('model_timing'), st.session_state.project_id),
+                lambda: build_model_timing_chart(model_df, unique_id),
+            )
             selected_model_run = plotly_events(model_fig, override_height=OVERRIDE_HEIGHT)
             
             if selected_model_run:
                 model_run_index = selected_model_run[0]['pointNumber']
-                get_sql(model_df, model_df.loc[model_run_index]['runId'])
+                get_sql(unique_id, model_df.loc[model_run_index]['runId'])
             else:
-                get_sql(model_df, runs_df.loc[run_index]['id'])
+                get_sql(unique_id, runs_df.loc[run_index]['id'])
@@ -0,0 +1,69 @@
+# third party
+import pandas as pd
+import streamlit as st
+
+st.set_page_config(
+    page_title='dbtc Explorer - Request Log', page_icon='🔍', layout='wide'
+)
+
+# first party
+from utils import client
+
+
+st.write('# Request Log')
+
+st.markdown('''
+Every API request made by this session, grouped by script rerun (most recent
+first).  This page's own rerun is not included.
+''')
+
+pool = client.pool_stats()
+if len(pool) > 0:
+    st.write('## Connection Pool')
+    st.caption(
+        'Keep-alive connections shared by every session on this server.  '
+        'Requests beyond the connections opened reused a warm connection.'
+    )
+    col1, col2, col3 = st.columns(3)
+    connections = sum(p['connections'] for p in pool)
+    requests_sent = sum(p['requests'] for p in pool)
+    col1.metric('Connections Opened', connections)
+    col2.metric('Requests Sent', requests_sent)
+    col3.metric('Reused', f'{round((1 - connections / max(requests_sent, 1)) * 100, 1)}%')
+    st.dataframe(pd.DataFrame(pool), use_container_width=True)
+
+st.write('## Requests')
+
+log = st.session_state.get('request_log', [])
+
+if len(log) == 0:
+    st.info('No requests recorded yet.  Visit one of the other pages first.')
+    st.stop()
+
+st.download_button(
+    label='Download as JSON lines',
+    data=client.request_log_jsonl(log),
+    file_name='request_log.jsonl',
+    mime='application/x-ndjson',
+)
+
+for rerun in reversed(log):
+    requests = rerun['requests']
+    misses = [r for r in requests if not r['cache_hit']]
+    title = (
+        f"Rerun {rerun['rerun']} - {rerun['page']} - {len(requests)} requests, "
+        f"{len(misses)} to the API, "
+        f"{round(sum(r['latency_ms'] for r in requests))} ms"
+    )
+    with st.expander(title, expanded=rerun is log[-1]):
+        if len(requests) == 0:
+            st.write('No requests')
+            continue
+
+        df = pd.DataFrame(requests)
+        st.dataframe(
+            df[['method', 'args', 'kwargs', 'latency_ms', 'bytes', 'cache_hit', 'thread']]
+            .astype({'args': str, 'kwargs': str})
+            .sort_values('latency_ms', ascending=False),
+            use_container_width=True,
+        )
@@ -1,8 +1,13 @@
+import math
+
+import pandas as pd
+import streamlit as st
 from st_aggrid import AgGrid
 from st_aggrid.grid_options_builder import GridOptionsBuilder
 from st_aggrid.shared import GridUpdateMode, JsCode
 
 MAX_TABLE_HEIGHT = 500
+PAGE_SIZE = 50
 
 
 def get_numeric_style_with_precision(precision: int) -> dict:
@@ -29,11 +34,30 @@ def draw_grid(
         key=None,
         css: dict = None,
         configure_selection: dict = None,
+        columns: list = None,
+        page_size: int = None,
 ):
+    """Draw df with AgGrid.
+
+    columns prunes df to the columns the grid needs (those in formatter plus
+    any that renderers read).  With page_size, frames longer than a page are
+    filtered, sorted and paged in pandas, and only the current page is sent to
+    the grid.  Paging needs a key, which also keys the page controls.
+    """
+    if page_size is not None and key is None:
+        raise ValueError("draw_grid needs a key when page_size is set")
+
+    if columns is not None:
+        df = df[columns]
+
+    paged = page_size is not None and len(df.index) > page_size
+    if paged:
+        df = _draw_page_controls(df, formatter, page_size, key)
 
     gb = GridOptionsBuilder()
     gb.configure_default_column(
-        filterable=True,
+        filterable=not paged,
+        sortable=not paged,
         groupable=False,
         editable=False,
         wrapText=wrap_text,
@@ -53,10 +77,15 @@ def draw_grid(
         selection_mode=selection, use_checkbox=use_checkbox, **configure_selection
     )
 
+    if selection is None and not editable_columns(formatter):
+        update_mode = GridUpdateMode.NO_UPDATE
+    else:
+        update_mode = GridUpdateMode.SELECTION_CHANGED | GridUpdateMode.VALUE_CHANGED
+
     return AgGrid(
         df,
         gridOptions=gb.build(),
-        update_mode=GridUpdateMode.SELECTION_CHANGED | GridUpdateMode.VALUE_CHANGED,
+        update_mode=update_mode,
         allow_unsafe_jscode=True,
         fit_columns_on_grid_load=fit_columns,
         height=min(max_height, (1 + len(df.index)) * 29),
@@ -66,6 +95,73 @@ def draw_grid(
     )
 
 
+def editable_columns(formatter: dict) -> list:
+    return [
+        name for name, (_, style_dict) in (formatter or {}).items()
+        if style_dict.get("editable")
+    ]
+
+
+def filter_rows(df: pd.DataFrame, filter_text: str) -> pd.DataFrame:
+    """Rows where any text column contains filter_text, ignoring case."""
+    if not filter_text:
+        return df
+
+    matches = pd.Series(False, index=df.index)
+    for column in df.select_dtypes(include=["object", "category"]).columns:
+        matches |= df[column].astype(str).str.contains(
+            filter_text, case=False, regex=False
+        )
+    return df[matches]
+
+
+def page_rows(
+        df: pd.DataFrame,
+        page: int,
+        page_size: int = PAGE_SIZE,
+        sort_by: str = None,
+        ascending: bool = True,
+) -> pd.DataFrame:
+    """Rows of df on the given page (1-based), optionally after sorting."""
+    if sort_by is not None:
+        df = df.sort_values(sort_by, ascending=ascending, kind="stable")
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size]
+
+
+def _draw_page_controls(df, formatter: dict, page_size: int, key: str):
+    headers = {
+        name: header for name, (header, _) in (formatter or {}).items()
+    }
+    filter_col, sort_col, order_col, page_col = st.columns([3, 2, 1, 1])
+    filter_text = filter_col.text_input("Filter", key=f"{key}_filter")
+    sort_by = sort_col.selectbox(
+        "Sort by",
+        [None] + list(df.columns),
+        format_func=lambda c: "" if c is None else headers.get(c, c),
+        key=f"{key}_sort_by",
+    )
+    ascending = order_col.selectbox(
+        "Order",
+        [True, False],
+        format_func=lambda a: "Ascending" if a else "Descending",
+        key=f"{key}_ascending",
+    )
+
+    df = filter_rows(df, filter_text)
+    n_pages = max(1, math.ceil(len(df.index) / page_size))
+
+    # A page left over from a wider filter may no longer exist
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > n_pages:
+        st.session_state[page_key] = n_pages
+    page = page_col.number_input(
+        f"Page (of {n_pages})", min_value=1, max_value=n_pages, step=1, key=page_key
+    )
+    st.caption(f"{len(df.index)} rows")
+    return page_rows(df, page, page_size, sort_by, ascending)
+
+
 def highlight(color, condition):
     code = f"""
         function(params) {{
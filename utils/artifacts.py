@@ -0,0 +1,126 @@
+# stdlib
+import codecs
+import copy
+import json
+import re
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# third party
+import requests
+
+# first party
+from utils import client
+
+
+RUN_RESULTS = 'run_results.json'
+CHUNK_SIZE = 64 * 1024
+MODEL_PREFIX = 'model.'
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str) -> Iterator:
+    """Items of the array under key in a JSON document read as chunks of bytes.
+
+    Only the item being read is held in memory, so the rest of a large
+    document (e.g. the compiled SQL of every node) is never parsed as a whole.
+    The first "key": [ in the document is taken to be the array.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    start = re.compile(r'"' + re.escape(key) + r'"\s*:\s*\[')
+    buffer = ''
+    pos = None
+    for chunk in chunks:
+        buffer += utf8.decode(chunk)
+        if pos is None:
+            match = start.search(buffer)
+            if match is None:
+                # Keep enough to find the key if it straddles two chunks
+                buffer = buffer[-(len(key) + 256):]
+                continue
+            pos = match.end()
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos == len(buffer):
+                break
+            if buffer[pos] == ']':
+                return
+
+            try:
+                item, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # the item continues in the next chunk
+            yield item
+        buffer = buffer[pos:]
+        pos = 0
+
+    if pos is not None:
+        raise ValueError(f'{key} array is incomplete')
+
+
+def node_timing(result: Dict, run_id: int) -> Dict:
+    """A run_results.json result in the shape of the Metadata API's model fields."""
+    execute = next(
+        (t for t in result.get('timing') or [] if t.get('name') == 'execute'), {}
+    )
+    unique_id = result['unique_id']
+    return {
+        'name': unique_id.split('.')[-1],
+        'uniqueId': unique_id,
+        'runId': run_id,
+        'status': result.get('status'),
+
+        # Nodes that didn't execute (e.g. skipped) didn't take up a thread
+        'threadId': result.get('thread_id') if execute else None,
+        'executionTime': result.get('execution_time'),
+        'executeStartedAt': execute.get('started_at'),
+        'executeCompletedAt': execute.get('completed_at'),
+    }
+
+
+def fetch_run_timings(_prop, account_id: int, run_id: int) -> Optional[List[Dict]]:
+    """Model timings from a run's run_results.json, streamed rather than loaded whole.
+
+    None if the run has no artifacts (e.g. it hasn't finished), its last step
+    didn't build models, as when models are built in an earlier step than the
+    one that ran tests, or they couldn't be read; callers then fall back to the
+    Metadata API.
+    """
+    # dbtc sets the API version path per call, so copy rather than share it
+    prop = copy.copy(_prop)
+    prop._path = '/api/v2/'
+    client.get_scheduler(prop)
+    try:
+        response = prop.session.get(
+            prop.full_url(f'accounts/{account_id}/runs/{run_id}/artifacts/{RUN_RESULTS}'),
+            stream=True,
+        )
+        with response:
+            if response.status_code != 200:
+                return None
+
+            models = [
+                node_timing(result, run_id)
+                for result in iter_json_array(response.iter_content(CHUNK_SIZE), 'results')
+                if result.get('unique_id', '').startswith(MODEL_PREFIX)
+            ]
+    except (requests.RequestException, ValueError):
+        # ValueError covers a body cut short (or not JSON)
+        return None
+    return models or None
+
+
+def get_run_timings(_prop, account_id: int, run_id: int) -> Optional[List[Dict]]:
+    """Cached fetch_run_timings; runs without timings are asked for again."""
+    return client.cached_call(
+        _prop,
+        'run_results',
+        lambda account_id, run_id: fetch_run_timings(_prop, account_id, run_id),
+        int(account_id),
+        int(run_id),
+    )
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,189 @@
+# stdlib
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+# Seconds a response stays fresh, by method.  Anything not listed uses
+# DEFAULT_TTL, and a TTL of 0 means the method is never cached.
+DEFAULT_TTL = 300
+METHOD_TTLS: Dict[str, int] = {
+    'list_accounts': 3600,
+    'list_projects': 900,
+    'list_environments': 900,
+    'list_connections': 900,
+    'list_credentials': 900,
+    'list_groups': 900,
+    'list_users': 900,
+    'list_service_tokens': 900,
+    'list_jobs': 300,
+    'list_runs': 30,
+    'get_run': 30,
+    'get_most_recent_run': 30,
+    # Artifacts of a finished run don't change
+    'run_results': 86400,
+}
+UNCACHED_PREFIXES = (
+    'assign_',
+    'cancel_',
+    'create_',
+    'deactivate_',
+    'delete_',
+    'test_',
+    'trigger_',
+    'update_',
+)
+
+# Cached methods each write can change, cleared when it's made.  A write not
+# listed here clears everything cached for its credentials.
+_RUNS = ('list_runs', 'get_run', 'get_most_recent_run', 'get_most_recent_run_artifact')
+_CONNECTIONS = ('list_connections', 'list_projects', 'get_project')
+_CREDENTIALS = ('list_credentials', 'list_environments', 'list_environments_by_account')
+_ENVIRONMENTS = ('list_environments', 'list_environments_by_account', 'list_projects', 'get_project')
+_GROUPS = ('list_groups', 'list_users', 'get_user')
+_JOBS = ('list_jobs', 'get_job')
+_PROJECTS = (
+    'list_projects',
+    'get_project',
+    'list_environments',
+    'list_environments_by_account',
+    'list_connections',
+    'list_credentials',
+    'list_repositories',
+    'list_jobs',
+)
+_REPOSITORIES = ('list_repositories', 'list_projects', 'get_project')
+_SERVICE_TOKENS = ('list_service_tokens', 'get_service_token', 'list_service_token_permissions')
+_WEBHOOKS = ('list_webhooks', 'get_webhook')
+WRITE_INVALIDATES: Dict[str, Tuple[str, ...]] = {
+    'assign_group_permissions': _GROUPS,
+    'assign_service_token_permissions': _SERVICE_TOKENS,
+    'assign_user_to_group': _GROUPS,
+    'cancel_run': _RUNS,
+    'create_adapter': _CONNECTIONS,
+    'create_connection': _CONNECTIONS,
+    'create_credentials': _CREDENTIALS,
+    'create_environment': _ENVIRONMENTS,
+    'create_environment_variables': (),
+    'create_job': _JOBS,
+    'create_project': _PROJECTS,
+    'create_repository': _REPOSITORIES,
+    'create_service_token': _SERVICE_TOKENS,
+    'create_user_group': _GROUPS,
+    'create_webhook': _WEBHOOKS,
+    'deactivate_user_license': ('list_users', 'get_user', 'get_account_licenses'),
+    'delete_connection': _CONNECTIONS,
+    'delete_environment': _ENVIRONMENTS + _JOBS,
+    'delete_environment_variables': (),
+    'delete_job': _JOBS,
+    'delete_project': _PROJECTS,
+    'delete_repository': _REPOSITORIES,
+    'delete_user_group': _GROUPS,
+    'delete_webhook': _WEBHOOKS,
+    'test_connection': (),
+    'test_webhook': (),
+    'trigger_autoscaling_ci_job': _RUNS,
+    'trigger_job': _RUNS,
+    'trigger_job_from_failure': _RUNS,
+    'update_connection': _CONNECTIONS,
+    'update_credentials': _CREDENTIALS,
+    'update_environment': _ENVIRONMENTS,
+    'update_job': _JOBS,
+    'update_project': _PROJECTS,
+    'update_repository': _REPOSITORIES,
+    'update_webhook': _WEBHOOKS,
+}
+MAX_BYTES = int(os.getenv('DBTC_STREAMLIT_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+
+def method_ttl(method: str) -> int:
+    if method.startswith(UNCACHED_PREFIXES):
+        return 0
+
+    return METHOD_TTLS.get(method, DEFAULT_TTL)
+
+
+def fingerprint(prop) -> str:
+    """Identify the credentials and host a dbtc client sends requests with."""
+    token = getattr(prop, 'service_token', None) or getattr(prop, 'api_key', None)
+    raw = f'{type(prop).__name__}|{getattr(prop, "_host", None)}|{token}'
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def request_key(method: str, args: Tuple, kwargs: Dict) -> str:
+    raw = pickle.dumps((method, args, sorted(kwargs.items())))
+    return hashlib.sha256(raw).hexdigest()
+
+
+class RequestCache:
+    """Thread-safe LRU cache of pickled responses, bounded by total bytes.
+
+    Entries are grouped by namespace (a client fingerprint) and method so they
+    can be invalidated without touching other users' entries.
+    """
+
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: 'OrderedDict[Hashable, Tuple[bytes, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, method: str, key: str) -> Tuple[bool, Any, int]:
+        """Return whether key was cached, its value and its size in bytes."""
+        entry_key = (namespace, method, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is None:
+                return False, None, 0
+
+            payload, expires_at = entry
+            if expires_at < time.monotonic():
+                self._pop(entry_key)
+                return False, None, 0
+
+            self._entries.move_to_end(entry_key)
+        return True, pickle.loads(payload), len(payload)
+
+    def set(
+        self, namespace: str, method: str, key: str, value: Any, ttl: int
+    ) -> int:
+        """Cache value for ttl seconds, returning its size in bytes."""
+        payload = pickle.dumps(value)
+        if len(payload) > self.max_bytes:
+            return len(payload)
+
+        entry_key = (namespace, method, key)
+        with self._lock:
+            self._pop(entry_key)
+            self._entries[entry_key] = (payload, time.monotonic() + ttl)
+            self.size += len(payload)
+            while self.size > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+        return len(payload)
+
+    def invalidate(self, namespace: str, method: Optional[str] = None):
+        with self._lock:
+            for entry_key in list(self._entries):
+                if entry_key[0] == namespace and method in (None, entry_key[1]):
+                    self._pop(entry_key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _pop(self, entry_key: Hashable):
+        entry = self._entries.pop(entry_key, None)
+        if entry is not None:
+            self.size -= len(entry[0])
+
+    def __len__(self):
+        return len(self._entries)
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,90 @@
+# stdlib
+import copy
+from datetime import datetime, timezone
+from typing import Dict, List
+
+# third party
+import streamlit as st
+
+# first party
+from utils import client
+
+
+# Entity lists fetched for an account, and the project level lists fetched for
+# each of its projects once the projects are known
+ACCOUNT_ENTITIES = {
+    'projects': 'list_projects',
+    'environments': 'list_environments',
+    'jobs': 'list_jobs',
+    'groups': 'list_groups',
+    'users': 'list_users',
+    'service_tokens': 'list_service_tokens',
+}
+PROJECT_ENTITIES = {
+    'connections': 'list_connections',
+    'credentials': 'list_credentials',
+}
+MAX_WORKERS = 8
+
+
+def _fetch(prop, method: str, *args) -> List[Dict]:
+    # dbtc sets the API version path on the client per call, so concurrent calls
+    # to v2 and v3 methods each need their own copy (the session is shared)
+    return client.dynamic_request(copy.copy(prop), method, *args).get('data') or []
+
+
+def load_catalog(prop, account_id: int) -> Dict:
+    """Fetch every entity list for an account in parallel."""
+    entities = list(ACCOUNT_ENTITIES.keys())
+    results = client.map_concurrently(
+        lambda entity: _fetch(prop, ACCOUNT_ENTITIES[entity], account_id),
+        entities,
+        MAX_WORKERS,
+    )
+    catalog = {
+        'account_id': account_id,
+        'loaded_at': datetime.now(timezone.utc).isoformat(),
+        **dict(zip(entities, results)),
+    }
+
+    calls = [
+        (entity, project['id'])
+        for project in catalog['projects']
+        for entity in PROJECT_ENTITIES
+    ]
+    results = client.map_concurrently(
+        lambda call: _fetch(prop, PROJECT_ENTITIES[call[0]], account_id, call[1]),
+        calls,
+        MAX_WORKERS,
+    )
+    for entity in PROJECT_ENTITIES:
+        catalog[entity] = []
+    for (entity, project_id), items in zip(calls, results):
+        for item in items:
+            item.setdefault('project_id', project_id)
+        catalog[entity].extend(items)
+    return catalog
+
+
+def get_catalog() -> Dict:
+    """The catalog for the selected account, loading it if needed."""
+    catalog = st.session_state.get('catalog')
+    if catalog is None or catalog['account_id'] != st.session_state.account_id:
+        catalog = load_catalog(
+            st.session_state.dbtc_client.cloud, st.session_state.account_id
+        )
+        st.session_state.catalog = catalog
+    return catalog
+
+
+def list_entities(entity: str, **filters) -> List[Dict]:
+    """Entities from the catalog matching every filter that has a value."""
+    filters = {k: v for k, v in filters.items() if v is not None and v != []}
+    return [
+        item for item in get_catalog()[entity]
+        if all(item.get(k) == v for k, v in filters.items())
+    ]
+
+
+if __name__ == '__main__':
+    pass
@@ -1,16 +1,317 @@
+# stdlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List
+
 # third party
 import streamlit as st
+from dbtc.client.metadata import _MetadataClient
 from requests.exceptions import ConnectionError
+from streamlit.runtime.scriptrunner import add_script_run_ctx
+from streamlit.runtime.scriptrunner.script_run_context import (
+    SCRIPT_RUN_CONTEXT_ATTR_NAME,
+)
+from urllib3 import PoolManager
 
+# first party
+from utils import cache, scheduler
 
-@st.cache_data(show_spinner=False)
-def dynamic_request(_prop, method, *args, **kwargs):
+
+DEFAULT_PAGE_SIZE = 100
+
+# Shared by every session on this server; entries are namespaced by the
+# fingerprint of the client (token and host) that made the request.
+_cache = cache.RequestCache()
+
+# Requests are logged per script rerun in st.session_state.request_log; set
+# DBTC_STREAMLIT_REQUEST_LOG to also append every record to a JSON lines file.
+REQUEST_LOG_PATH = os.getenv('DBTC_STREAMLIT_REQUEST_LOG')
+MAX_LOGGED_RERUNS = 50
+_log_file_lock = threading.Lock()
+
+# Arguments whose names contain any of these, and any dict (e.g. a payload
+# passed positionally), are logged as REDACTED rather than their value
+SENSITIVE_ARGUMENTS = ('payload', 'token', 'password', 'secret')
+REDACTED = '<redacted>'
+
+# One scheduler per API and set of credentials, also shared across sessions
+_schedulers: Dict[str, scheduler.RequestScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+# Keep-alive connections shared by every session's dbtc clients, up to
+# POOL_MAXSIZE idle connections for each of the POOL_HOSTS most recent hosts.
+# dbtc replaces requests' default headers, so compression is asked for again.
+POOL_HOSTS = int(os.getenv('DBTC_STREAMLIT_POOL_HOSTS', 10))
+POOL_MAXSIZE = int(os.getenv('DBTC_STREAMLIT_POOL_MAXSIZE', 32))
+TRANSPORT_HEADERS = {'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'}
+_pool_manager = PoolManager(num_pools=POOL_HOSTS, maxsize=POOL_MAXSIZE)
+
+
+def script_run_ctx():
+    """The current thread's script run context, if it has one.
+
+    Unlike get_script_run_ctx, doesn't log a warning on background threads.
+    """
+    return getattr(threading.current_thread(), SCRIPT_RUN_CONTEXT_ATTR_NAME, None)
+
+
+def begin_rerun(page: str):
+    """Start a new entry in this session's request log.  Call at the top of a page."""
+    if 'request_log' not in st.session_state:
+        st.session_state.request_log = []
+    log = st.session_state.request_log
+    log.append({
+        'rerun': log[-1]['rerun'] + 1 if log else 1,
+        'page': page,
+        'started_at': datetime.now(timezone.utc).isoformat(),
+        'requests': [],
+    })
+    del log[:-MAX_LOGGED_RERUNS]
+
+
+def _loggable(name: str, value) -> str:
+    if isinstance(value, dict) or any(s in name.lower() for s in SENSITIVE_ARGUMENTS):
+        return REDACTED
+    return repr(value)
+
+
+def _record(
+    method: str, args, kwargs: Dict, started: float, size: int, cache_hit: bool
+):
+    ctx = script_run_ctx()
+    if ctx is None:
+        return
+
+    log = st.session_state.get('request_log')
+    rerun = log[-1] if log else None
+    record = {
+        'session_id': ctx.session_id,
+        'rerun': rerun['rerun'] if rerun else None,
+        'page': rerun['page'] if rerun else None,
+        'method': method,
+        'args': [_loggable('', a) for a in args],
+        'kwargs': {k: _loggable(k, v) for k, v in kwargs.items()},
+        'latency_ms': round((time.perf_counter() - started) * 1000, 2),
+        'bytes': size,
+        'cache_hit': cache_hit,
+        'thread': threading.current_thread().name,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+    }
+    if rerun is not None:
+        rerun['requests'].append(record)
+    if REQUEST_LOG_PATH:
+        with _log_file_lock, open(REQUEST_LOG_PATH, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+
+def request_log_jsonl(log: List[Dict]) -> str:
+    """Flatten a session's request log into JSON lines, one request per line."""
+    return ''.join(
+        json.dumps(record) + '\n' for rerun in log for record in rerun['requests']
+    )
+
+
+def get_scheduler(prop) -> scheduler.RequestScheduler:
+    """The scheduler for prop's API and credentials, mounted on its session."""
+    namespace = cache.fingerprint(prop)
+    with _schedulers_lock:
+        if namespace not in _schedulers:
+            _schedulers[namespace] = scheduler.RequestScheduler()
+        request_scheduler = _schedulers[namespace]
+
+        session = getattr(prop, 'session', None)
+        adapter = session.adapters.get('https://') if session is not None else None
+        if session is not None and getattr(adapter, 'scheduler', None) is not request_scheduler:
+            # Metadata API POSTs are GraphQL queries, safe to retry
+            methods = scheduler.IDEMPOTENT_METHODS
+            if isinstance(prop, _MetadataClient):
+                methods = methods | {'POST'}
+            adapter = scheduler.ScheduledAdapter(
+                request_scheduler, methods, pool_manager=_pool_manager
+            )
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update(TRANSPORT_HEADERS)
+    return request_scheduler
+
+
+def pool_stats() -> List[Dict]:
+    """Connections opened and requests sent over the shared pool, by host.
+
+    Hosts dropped from the pool (past POOL_HOSTS) are no longer counted.
+    """
+    stats = []
+    for key in _pool_manager.pools.keys():
+        pool = _pool_manager.pools.get(key)
+        if pool is None:
+            continue
+
+        stats.append({
+            'host': f'{pool.scheme}://{pool.host}:{pool.port}',
+            'connections': pool.num_connections,
+            'requests': pool.num_requests,
+            'idle': pool.pool.qsize() if pool.pool is not None else 0,
+        })
+    return stats
+
+
+def _call(prop, method, *args, **kwargs):
+    request_scheduler = get_scheduler(prop)
+    func = getattr(prop, method)
     try:
-        return getattr(_prop, method)(*args, **kwargs)
+        # The metadata client's typed methods go through sgqlc and urllib rather
+        # than the session, so they're scheduled here instead of by the adapter
+        if isinstance(prop, _MetadataClient) and method != 'query':
+            return request_scheduler.call(
+                lambda: func(*args, **kwargs), scheduler.graphql_error_status
+            )
+        return func(*args, **kwargs)
     except ConnectionError as e:
+        # Background threads (e.g. prefetching) can't stop the script; their
+        # callers handle the error instead
+        if script_run_ctx() is None:
+            raise
         st.error(e)
         st.stop()
 
 
+def request(prop, method, *args, **kwargs):
+    started = time.perf_counter()
+    responses, received_bytes = scheduler.received()
+    response = _call(prop, method, *args, **kwargs)
+
+    # Bodies received on this thread while making the call; None for the
+    # metadata client's typed methods, which don't go through the session
+    after_responses, after_bytes = scheduler.received()
+    size = after_bytes - received_bytes if after_responses > responses else None
+    _record(method, args, kwargs, started, size, False)
+    return response
+
+
+def dynamic_request(_prop, method, *args, **kwargs):
+    ttl = cache.method_ttl(method)
+    if ttl <= 0:
+        response = request(_prop, method, *args, **kwargs)
+
+        # Writes clear what they can change, or everything for these credentials
+        if method.startswith(cache.UNCACHED_PREFIXES):
+            affected = cache.WRITE_INVALIDATES.get(method)
+            for read_method in affected if affected is not None else [None]:
+                invalidate(_prop, read_method)
+        return response
+
+    return cached_call(
+        _prop, method, lambda *a, **k: _call(_prop, method, *a, **k), *args, **kwargs
+    )
+
+
+def cached_call(_prop, method: str, func: Callable, *args, **kwargs):
+    """func(*args, **kwargs), cached for _prop's credentials like a dbtc method.
+
+    For requests dbtc can't make itself; method names the request for its TTL,
+    the request log and invalidation.  None is never cached.
+    """
+    namespace = cache.fingerprint(_prop)
+    started = time.perf_counter()
+    key = cache.request_key(method, args, kwargs)
+    hit, response, size = _cache.get(namespace, method, key)
+    if not hit:
+        response = func(*args, **kwargs)
+        if response is not None:
+            size = _cache.set(namespace, method, key, response, cache.method_ttl(method))
+    _record(method, args, kwargs, started, size, hit)
+    return response
+
+
+def invalidate(_prop, method: str = None):
+    """Drop cached responses for _prop's credentials, optionally just one method."""
+    _cache.invalidate(cache.fingerprint(_prop), method)
+
+
+def map_concurrently(func: Callable, items: Iterable, max_workers: int = 1) -> List:
+    """Apply func to each item on a thread pool, returning results in item order.
+
+    Worker threads are attached to the calling script's run context so that
+    streamlit calls made inside func (caching, st.error, etc.) behave as they
+    would on the script thread.
+    """
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    ctx = script_run_ctx()
+
+    def _call(item):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        return func(item)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(_call, items))
+
+
+def iter_paginated_request(
+    _prop,
+    method: str,
+    *args,
+    max_items: int,
+    start: int = 0,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    concurrency: int = 1,
+    cached: bool = True,
+    **kwargs,
+) -> Iterator[List]:
+    """Yield the `data` of an offset/limit paginated method one wave at a time.
+
+    Pages are requested in waves of `concurrency` offsets at a time, beginning
+    at offset `start`, until max_items have been requested.  Each wave's data
+    is yielded in the order the API returned it, and fetching stops after the
+    first wave containing a short page.  Set `cached` to False to always go to
+    the API.
+    """
+    func = dynamic_request if cached else request
+    end = start + max_items
+
+    def _page(offset):
+        return func(
+            _prop,
+            method,
+            *args,
+            offset=offset,
+            limit=min(page_size, end - offset),
+            **kwargs,
+        ).get('data', [])
+
+    offsets = list(range(start, end, page_size))
+    concurrency = max(1, concurrency)
+    for i in range(0, len(offsets), concurrency):
+        wave = offsets[i:i + concurrency]
+        wave_data = []
+        for offset, data in zip(wave, map_concurrently(_page, wave, concurrency)):
+            wave_data.extend(data)
+            if len(data) < min(page_size, end - offset):
+                yield wave_data
+                return
+
+        yield wave_data
+
+
+def paginated_request(_prop, method: str, *args, max_items: int, **kwargs) -> List:
+    """Collect up to max_items of the `data` of an offset/limit paginated method.
+
+    Takes the same arguments as `iter_paginated_request`.
+    """
+    all_data = []
+    for data in iter_paginated_request(
+        _prop, method, *args, max_items=max_items, **kwargs
+    ):
+        all_data.extend(data)
+    return all_data
+
+
 if __name__ == '__main__':
     pass
@@ -0,0 +1,209 @@
+# stdlib
+import inspect
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# third party
+import streamlit as st
+from dbtc.client.admin import _AdminClient
+from dbtc.client.metadata import _MetadataClient
+
+# first party
+from utils import inputs
+from utils.helpers import prop_public_methods
+
+
+@dataclass(frozen=True)
+class Parameter:
+    """How the explorer pages ask for a method parameter.
+
+    widget draws the input, taking whether the parameter is required, and
+    build turns its value into the argument to pass (None to leave it out).
+    """
+
+    widget: Callable[[bool], Any]
+    build: Optional[Callable[[Any], Any]] = None
+
+
+@dataclass(frozen=True)
+class Method:
+    name: str
+
+    # (name, is_required, Parameter) of the parameters that have a widget, in
+    # the order of the method's signature
+    parameters: Tuple[Tuple[str, bool, Parameter], ...]
+
+
+def _text(label: str, key: str) -> Parameter:
+    return Parameter(lambda is_required: st.text_input(label=label, key=key))
+
+
+def _checkbox(label: str, key: str, value: bool, help: str = None) -> Parameter:
+    return Parameter(
+        lambda is_required: st.checkbox(label=label, value=value, key=key, help=help)
+    )
+
+
+def _account(is_required: bool):
+    inputs.get_account_widget()
+    return st.session_state.account_id
+
+
+def _payload(value: str):
+    return json.loads(value) if value != '' else None
+
+
+# Parameters without an entry here get no widget and are left to their
+# defaults.  Add an entry to give every method that takes it a widget.
+ADMIN_PARAMETERS = {
+    'account_id': Parameter(_account),
+    'connection_id': Parameter(inputs.get_connection_widget),
+    'credentials_id': Parameter(inputs.get_credential_widget),
+    'delete_cloned_job': _checkbox(
+        'Delete Cloned Job?',
+        'delete_cloned_job',
+        True,
+        'Indicate whether cloned job should be deleted after completion.',
+    ),
+    'environment_id': Parameter(inputs.get_environment_widget),
+    'group_id': Parameter(inputs.get_group_widget),
+    'include_related': _text('Include Related', 'include_related'),
+    'job_definition_id': Parameter(inputs.get_job_widget),
+    'job_id': Parameter(inputs.get_job_widget),
+    'limit': Parameter(
+        lambda is_required: st.number_input(
+            label='Limit', min_value=1, max_value=100, value=100, key='limit'
+        )
+    ),
+    'logged_at_end': Parameter(
+        lambda is_required: st.date_input(label='Logged At End', key='logged_at_end')
+    ),
+    'logged_at_start': Parameter(
+        lambda is_required: st.date_input(label='Logged At Start', key='logged_at_start')
+    ),
+    'offset': Parameter(
+        lambda is_required: st.number_input(label='Offset', min_value=0, value=0, key='offset')
+    ),
+    'order_by': _text('Order By', 'order_by'),
+    'path': _text('Path', 'path'),
+    'payload': Parameter(
+        lambda is_required: st.text_area(
+            label='Payload',
+            key='payload',
+            help='Payload should be a valid JSON string',
+            placeholder='{"key": "value"}',
+        ),
+        _payload,
+    ),
+    'permission_id': Parameter(
+        lambda is_required: st.number_input(
+            label='Permission ID', min_value=1, value=1
+        )
+    ),
+    'poll_interval': Parameter(
+        lambda is_required: st.number_input(
+            label='Poll Interval', min_value=5, value=10
+        )
+    ),
+    'project_id': Parameter(inputs.get_project_widget),
+    'repository_id': Parameter(
+        lambda is_required: st.number_input(
+            label='Repository ID', min_value=1, value=1
+        )
+    ),
+    'run_id': Parameter(lambda is_required: inputs.get_run_widget()),
+    'service_token_id': Parameter(lambda is_required: inputs.get_service_token_widget()),
+    'should_poll': _checkbox(
+        'Should Poll?',
+        'should_poll',
+        True,
+        'Indicate whether job should poll until completion or not',
+    ),
+    'status': Parameter(
+        lambda is_required: st.multiselect(
+            label='Status',
+            options=['cancelled', 'error', 'queued', 'running', 'starting', 'success'],
+            default=None,
+        )
+    ),
+    'step': Parameter(
+        lambda is_required: st.number_input(
+            label='Step', min_value=1, value=4, step=1
+        )
+    ),
+    'trigger_on_failure_only': _checkbox(
+        'Trigger on Failure Only?', 'trigger_on_failure_only', True
+    ),
+    'type': Parameter(
+        lambda is_required: st.selectbox(
+            label='Select Type',
+            options=[None, 'deployment', 'development'],
+            key='env_type',
+        )
+    ),
+    'user_id': Parameter(lambda is_required: inputs.get_users_widget()),
+}
+
+METADATA_PARAMETERS = {
+    'database': _text('Database', 'database'),
+    'environment_id': Parameter(inputs.get_environment_widget),
+    'identifier': _text('Identifier', 'identifier'),
+    'job_definition_id': Parameter(inputs.get_job_widget),
+    'job_id': Parameter(inputs.get_job_widget),
+    'last_run_count': Parameter(
+        lambda is_required: st.number_input(
+            label='Last Run Count',
+            min_value=1,
+            max_value=10,
+            value=10,
+            key='last_run_count',
+        )
+    ),
+    'name': _text('Name', 'name'),
+    'run_id': Parameter(lambda is_required: inputs.get_run_widget()),
+    'schema': _text('Schema', 'schema'),
+    'unique_id': _text('Unique ID', 'unique_id'),
+    'with_catalog': _checkbox(
+        'With Catalog?',
+        'with_catalog',
+        False,
+        'Return only runs that have catalog information',
+    ),
+}
+
+
+def build_registry(cls, parameters: Dict[str, Parameter]) -> Dict[str, Method]:
+    """The public methods of a dbtc client class, with the parameters to draw for each."""
+    registry = {}
+    for name in prop_public_methods(cls):
+        signature = inspect.signature(getattr(cls, name))
+        registry[name] = Method(
+            name=name,
+            parameters=tuple(
+                (key, parameter.default is not None, parameters[key])
+                for key, parameter in signature.parameters.items()
+                if key in parameters
+            ),
+        )
+    return registry
+
+
+# Built once, so reruns look methods up rather than inspecting the client
+ADMIN_METHODS = build_registry(_AdminClient, ADMIN_PARAMETERS)
+METADATA_METHODS = build_registry(_MetadataClient, METADATA_PARAMETERS)
+
+
+def draw_parameters(method: Method) -> Dict:
+    """Draw the widgets of method's parameters and return the arguments they give."""
+    form_params = {}
+    for key, is_required, parameter in method.parameters:
+        value = parameter.widget(is_required)
+        if parameter.build is not None:
+            value = parameter.build(value)
+        form_params[key] = value
+    return form_params
+
+
+if __name__ == '__main__':
+    pass
@@ -1,42 +1,130 @@
 # stdlib
-from typing import List
+import time
+from typing import Dict, List
 
 # third party
 import streamlit as st
 
 # first party
-from utils import client
-from utils.helpers import clear_session_state, list_to_dict
+from utils import cache, catalog, client
+from utils.helpers import list_to_dict
+
+
+# The selectors each selector's options depend on.  Changing a selector resets
+# only the selectors below it, and their options are rebuilt when their
+# parents' values differ from when they were last built.
+SELECTOR_PARENTS = {
+    'account_id': [],
+    'project_id': ['account_id'],
+    'environment_id': ['account_id', 'project_id'],
+    'job_id': ['account_id', 'project_id', 'environment_id'],
+    'run_id': ['account_id', 'job_id'],
+    'connection_id': ['account_id', 'project_id'],
+    'credential_id': ['account_id', 'project_id'],
+    'group_id': ['account_id'],
+    'service_token_id': ['account_id'],
+    'user_id': ['account_id'],
+}
+
+# Where each selector's options come from; the catalog holds every entity list
+# of the selected account
+SELECTOR_SOURCES = {
+    'account_id': 'accounts',
+    'project_id': 'catalog',
+    'environment_id': 'catalog',
+    'job_id': 'catalog',
+    'run_id': 'runs',
+    'connection_id': 'catalog',
+    'credential_id': 'catalog',
+    'group_id': 'catalog',
+    'service_token_id': 'catalog',
+    'user_id': 'catalog',
+}
 
-    
 
-def get_account_widget(states: List[str] = [
-    'project_index', 'job_index', 'environment_index'
-]):
-    accounts = client.dynamic_request(
+def _list_accounts() -> List[Dict]:
+    return client.dynamic_request(
         st.session_state.dbtc_client.cloud,
         'list_accounts',
     ).get('data', [])
-    accounts = list_to_dict(accounts)
+
+
+def _list_runs(**kwargs) -> List[Dict]:
+    return client.dynamic_request(
+        st.session_state.dbtc_client.cloud,
+        'list_runs',
+        st.session_state.account_id,
+        job_definition_id=st.session_state.get('job_id', None),
+        order_by='-id',
+        **kwargs,
+    ).get('data', [])
+
+
+# Seconds before options from a source are rebuilt even if their parents
+# haven't changed; the catalog is reloaded only for another account
+SOURCE_MAX_AGE = {
+    'accounts': cache.method_ttl('list_accounts'),
+    'runs': cache.method_ttl('list_runs'),
+}
+
+
+def descendants(key: str) -> List[str]:
+    """Selectors that depend on key, directly or not, parents before children."""
+    found = []
+    for child, parents in SELECTOR_PARENTS.items():
+        if key in parents or any(p in found for p in parents):
+            found.append(child)
+    return found
+
+
+def get_options(key: str, build, **kwargs) -> Dict:
+    """Options for selector key, rebuilt only when its parents' values change.
+
+    build takes the kwargs and returns the options dict.
+    """
+    memo = st.session_state.setdefault('selector_options', {})
+    memo_key = (
+        tuple(st.session_state.get(p) for p in SELECTOR_PARENTS[key]),
+        tuple(sorted(kwargs.items())),
+    )
+    max_age = SOURCE_MAX_AGE.get(SELECTOR_SOURCES[key])
+    entry = memo.get(key)
+    if (
+        entry is None
+        or entry[0] != memo_key
+        or (max_age is not None and time.monotonic() - entry[2] > max_age)
+    ):
+        entry = (memo_key, build(**kwargs), time.monotonic())
+        memo[key] = entry
+    return entry[1]
+
+
+def invalidate(key: str):
+    """on_change for selectors with dependents: resets the selectors below key."""
+    for child in descendants(key):
+        if child in st.session_state:
+            del st.session_state[child]
+
+
+def get_account_widget():
+    accounts = get_options(
+        'account_id', lambda: list_to_dict(_list_accounts())
+    )
     st.session_state.accounts = accounts
     return st.selectbox(
         label='Select Account',
         options=accounts.keys(),
         format_func=lambda x: accounts[x]['name'],
         key='account_id',
-        on_change=clear_session_state,
-        args=(states, )
+        on_change=invalidate,
+        args=('account_id', )
     )
     
     
 def get_connection_widget(is_required: bool = True):
-    connections = client.dynamic_request(
-        st.session_state.dbtc_client.cloud,
-        'list_connections',
-        st.session_state.account_id,
-        st.session_state.project_id,
-    ).get('data', [])
-    connections = list_to_dict(connections)
+    connections = get_options('connection_id', lambda: list_to_dict(
+        catalog.list_entities('connections', project_id=st.session_state.project_id)
+    ))
     options = list(connections.keys())
     if not is_required:
         options.insert(0, None)
@@ -59,13 +147,10 @@ def get_delete_cloned_job_widget():
     
     
 def get_credential_widget(is_required: bool = True):
-    credentials = client.dynamic_request(
-        st.session_state.dbtc_client.cloud,
-        'list_credentials',
-        st.session_state.account_id,
-        st.session_state.project_id,
-    ).get('data', [])
-    credentials = list_to_dict(credentials, value_field='schema')
+    credentials = get_options('credential_id', lambda: list_to_dict(
+        catalog.list_entities('credentials', project_id=st.session_state.project_id),
+        value_field='schema',
+    ))
     options = list(credentials.keys())
     if not is_required:
         options.insert(0, None)
@@ -80,14 +165,13 @@ def get_credential_widget(is_required: bool = True):
     
     
 def get_environment_widget(is_required: bool = True, **kwargs):
-    environments = client.dynamic_request(
-        st.session_state.dbtc_client.cloud,
-        'list_environments',
-        st.session_state.account_id,
-        project_id=st.session_state.get('project_id', []),
-        **kwargs
-    ).get('data', [])
-    environments = list_to_dict(environments)
+    environments = get_options('environment_id', lambda **kwargs: list_to_dict(
+        catalog.list_entities(
+            'environments',
+            project_id=st.session_state.get('project_id', None),
+            **kwargs
+        )
+    ), **kwargs)
     options = list(environments.keys())
     if not is_required:
         options.insert(0, None)
@@ -97,17 +181,16 @@ def get_environment_widget(is_required: bool = True, **kwargs):
         options=options,
         format_func=lambda x: environments[x]['name'] if x is not None else x,
         key='environment_id',
+        on_change=invalidate,
+        args=('environment_id', )
     )
 
     
     
 def get_group_widget(is_required: bool = True):
-    groups = client.dynamic_request(
-        st.session_state.dbtc_client.cloud,
-        'list_groups',
-        st.session_state.account_id,
-    ).get('data', [])
-    groups = list_to_dict(groups)
+    groups = get_options(
+        'group_id', lambda: list_to_dict(catalog.list_entities('groups'))
+    )
     options = list(groups.keys())
     if not is_required:
         options.insert(0, None)
@@ -116,19 +199,18 @@ def get_group_widget(is_required: bool = True):
         label='Select Group',
         options=options,
         format_func=lambda x: groups[x]['name'] if x is not None else x,
-        key='environment_id',
+        key='group_id',
     )
 
     
 def get_job_widget(is_required: bool = True, **kwargs):
-    jobs = client.dynamic_request(
-        st.session_state.dbtc_client.cloud,
-        'list_jobs',
-        st.session_state.account_id,
-        project_id=st.session_state.get('project_id', None),
-        **kwargs,
-    ).get('data', [])
-    jobs = list_to_dict(jobs)
+    jobs = get_options('job_id', lambda **kwargs: list_to_dict(
+        catalog.list_entities(
+            'jobs',
+            project_id=st.session_state.get('project_id', None),
+            **kwargs,
+        )
+    ), **kwargs)
     options = list(jobs.keys())
     if not is_required:
         options.insert(0, None)
@@ -138,40 +220,33 @@ def get_job_widget(is_required: bool = True, **kwargs):
         options=options,
         format_func=lambda x: jobs[x]['name'] if x is not None else x,
         key='job_id',
+        on_change=invalidate,
+        args=('job_id', )
     )
         
         
-def get_project_widget(states: List[str] = [], is_required: bool = True):
-    projects = client.dynamic_request(
-        st.session_state.dbtc_client.cloud,
-        'list_projects',
-        st.session_state.account_id,
-    ).get('data', [])
-    projects = list_to_dict(projects)
+def get_project_widget(is_required: bool = True):
+    projects = get_options(
+        'project_id', lambda: list_to_dict(catalog.list_entities('projects'))
+    )
     options = list(projects.keys())
     if not is_required:
         options.insert(0, None)
-    st.selectbox(
+    st.session_state.projects = projects
+    return st.selectbox(
         label='Select Project',
         options=options,
         format_func=lambda x: projects[x]['name'] if x is not None else x,
         key='project_id',
-        on_change=clear_session_state,
-        args=(states, )
+        on_change=invalidate,
+        args=('project_id', )
     )
-    st.session_state.projects = projects
     
     
 def get_run_widget(is_required: bool = True, **kwargs):
-    runs = client.dynamic_request(
-        st.session_state.dbtc_client.cloud,
-        'list_runs',
-        st.session_state.account_id,
-        job_definition_id=st.session_state.get('job_id', None),
-        order_by='-id',
-        **kwargs,
-    ).get('data', [])
-    runs = list_to_dict(runs, value_field='id', reverse=True)
+    runs = get_options('run_id', lambda **kwargs: list_to_dict(
+        _list_runs(**kwargs), value_field='id', reverse=True
+    ), **kwargs)
     options = list(runs.keys())
     if not is_required:
         options.insert(0, None)
@@ -184,12 +259,9 @@ def get_run_widget(is_required: bool = True, **kwargs):
     
     
 def get_service_token_widget():
-    service_tokens = client.dynamic_request(
-        st.session_state.dbtc_client.cloud,
-        'list_service_tokens',
-        st.session_state.account_id,
-    ).get('data', [])
-    service_tokens = list_to_dict(service_tokens)
+    service_tokens = get_options('service_token_id', lambda: list_to_dict(
+        catalog.list_entities('service_tokens')
+    ))
     return st.selectbox(
         label='Select Service Token',
         options=list(service_tokens.keys()),
@@ -199,12 +271,9 @@ def get_service_token_widget():
     
     
 def get_users_widget():
-        users = client.dynamic_request(
-            st.session_state.dbtc_client.cloud,
-            'list_users',
-            st.session_state.account_id,
-        ).get('data', [])
-        users = list_to_dict(users, value_field='email')
+        users = get_options('user_id', lambda: list_to_dict(
+            catalog.list_entities('users'), value_field='email'
+        ))
         return st.selectbox(
             label='Select User',
             options=list(users.keys()),
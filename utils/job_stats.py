@@ -0,0 +1,202 @@
+# third party
+import numpy as np
+import pandas as pd
+
+
+# What each run contributes to its job's stats
+RUN_COLUMNS = [
+    'job_name',
+    'run_duration_m',
+    'is_success',
+    'started_at',
+    'account_id',
+    'project_id',
+    'job_definition_id',
+]
+STATS_COLUMNS = [
+    'total_runs',
+    'total_success',
+    'success_rate',
+    'last_run',
+    'last_runtime',
+    'avg_runtime',
+    'max_runtime',
+    'std_runtime',
+    'url',
+    'job_id',
+]
+# Runs in these states can still change
+PENDING_STATUSES = ['Queued', 'Starting', 'Running']
+
+
+def _run_contributions(df: pd.DataFrame) -> pd.DataFrame:
+    runs = df[[c for c in RUN_COLUMNS if c != 'is_success']].copy()
+    runs['is_success'] = (df['status_humanized'] == 'Success').to_numpy()
+    runs['job_name'] = runs['job_name'].astype(object)
+    runs.index = pd.Index(df['id'].to_numpy(), name='id')
+    return runs
+
+
+def _summarize(runs: pd.DataFrame) -> pd.DataFrame:
+    """Per-job partial stats of runs, in a form that can be merged."""
+    grouped = runs.groupby('job_name', sort=False)
+    durations = grouped['run_duration_m']
+    summary = pd.DataFrame({
+        'total_runs': grouped.size(),
+        'total_success': grouped['is_success'].sum(),
+        'n': durations.count(),
+        'mean': durations.mean(),
+        'max_runtime': durations.max(),
+        'last_run': grouped['started_at'].max(),
+        'account_id': grouped['account_id'].first(),
+        'project_id': grouped['project_id'].first(),
+        'job_id': grouped['job_definition_id'].first(),
+    })
+    summary['m2'] = (durations.var(ddof=1) * (summary['n'] - 1)).fillna(0.0)
+    summary['mean'] = summary['mean'].fillna(0.0)
+
+    # The runtime of each job's newest (highest id) run that has one
+    timed = runs[runs['run_duration_m'].notna()]
+    newest = timed.index.to_series().groupby(timed['job_name']).idxmax()
+    summary['last_id'] = newest.reindex(summary.index).fillna(-1).astype('int64')
+    summary['last_runtime'] = timed['run_duration_m'].reindex(
+        summary['last_id']
+    ).to_numpy()
+    return summary
+
+
+def _merge(a: pd.DataFrame, b: pd.DataFrame) -> pd.DataFrame:
+    """Combine per-job partial stats of disjoint sets of runs.
+
+    Means and sums of squared differences combine with Chan et al.'s parallel
+    form of Welford's algorithm.
+    """
+    jobs = a.index.union(b.index)
+    a = a.reindex(jobs)
+    b = b.reindex(jobs)
+    for summary in (a, b):
+        summary[['total_runs', 'total_success', 'n', 'mean', 'm2']] = (
+            summary[['total_runs', 'total_success', 'n', 'mean', 'm2']].fillna(0)
+        )
+        summary['last_id'] = summary['last_id'].fillna(-1)
+
+    merged = pd.DataFrame(index=jobs)
+    merged['total_runs'] = a['total_runs'] + b['total_runs']
+    merged['total_success'] = a['total_success'] + b['total_success']
+    n = a['n'] + b['n']
+    delta = b['mean'] - a['mean']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        merged['mean'] = np.where(n > 0, a['mean'] + delta * b['n'] / n, 0.0)
+        merged['m2'] = np.where(
+            n > 0, a['m2'] + b['m2'] + delta ** 2 * a['n'] * b['n'] / n, 0.0
+        )
+    merged['n'] = n
+    merged['max_runtime'] = np.fmax(a['max_runtime'], b['max_runtime'])
+    merged['last_run'] = a['last_run'].mask(
+        a['last_run'].isna() | (b['last_run'] > a['last_run']), b['last_run']
+    )
+    newer = b['last_id'] > a['last_id']
+    merged['last_id'] = np.where(newer, b['last_id'], a['last_id']).astype('int64')
+    merged['last_runtime'] = np.where(newer, b['last_runtime'], a['last_runtime'])
+    for column in ['account_id', 'project_id', 'job_id']:
+        merged[column] = a[column].fillna(b[column])
+    return merged
+
+
+class JobStatsAggregator:
+    """Per-job run statistics, updated from only the runs that changed.
+
+    `update` takes the whole run frame each time and compares run ids with
+    the last frame it saw.  New runs are summarized and merged into the stats
+    of their jobs.  Jobs that lost a run (one that fell out of the window, or a
+    pending run whose status changed) are summarized again from their runs.
+    """
+
+    def __init__(self):
+        self._runs = _run_contributions(pd.DataFrame(
+            {c: [] for c in [*RUN_COLUMNS, 'id', 'status_humanized']}
+        ))
+        self._pending: pd.DataFrame = self._runs.iloc[:0]
+        self._jobs: pd.DataFrame = None
+        self._table: pd.DataFrame = None
+
+    def update(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Stats for df, matching `stats_table`."""
+        ids = pd.Index(df['id'].to_numpy())
+        added_ids = ids.difference(self._runs.index)
+        removed_ids = self._runs.index.difference(ids)
+        changed_ids = self._changed_ids(df, ids)
+
+        if self._jobs is None or len(removed_ids) + len(changed_ids) > len(ids) / 2:
+            self._runs = _run_contributions(df)
+            self._jobs = _summarize(self._runs)
+            self._table = None
+        elif len(added_ids) or len(removed_ids) or len(changed_ids):
+            stale = removed_ids.union(changed_ids)
+            rebuild = self._runs.loc[stale, 'job_name'].unique()
+            fresh = _run_contributions(
+                df[df['id'].isin(added_ids.union(changed_ids))]
+            )
+            self._runs = pd.concat([self._runs.drop(stale), fresh])
+
+            jobs = self._jobs.drop(rebuild)
+            rebuilt = self._runs[self._runs['job_name'].isin(rebuild)]
+            if len(rebuilt):
+                jobs = _merge(jobs, _summarize(rebuilt))
+            additions = fresh[~fresh['job_name'].isin(rebuild)]
+            if len(additions):
+                jobs = _merge(jobs, _summarize(additions))
+            self._jobs = jobs[jobs['total_runs'] > 0]
+            self._table = None
+
+        self._pending = df.loc[
+            df['status_humanized'].isin(PENDING_STATUSES),
+            ['id', 'status_humanized', 'run_duration_m'],
+        ]
+        if self._table is None:
+            self._table = stats_table(self._jobs)
+        return self._table.copy()
+
+    def _changed_ids(self, df: pd.DataFrame, ids: pd.Index) -> pd.Index:
+        # Only runs that were pending can change once stored
+        if len(self._pending) == 0:
+            return ids[:0]
+
+        before = self._pending.set_index('id')
+        after = df[df['id'].isin(before.index)].set_index('id')
+        after = after[['status_humanized', 'run_duration_m']]
+        before = before.reindex(after.index)
+        changed = (
+            (after['status_humanized'].astype(object) != before['status_humanized'].astype(object))
+            | (after['run_duration_m'].fillna(-1) != before['run_duration_m'].fillna(-1))
+        )
+        return after.index[changed.to_numpy()]
+
+
+def stats_table(jobs: pd.DataFrame) -> pd.DataFrame:
+    """Format per-job partial stats as the Analysis page's job stats table, by job name."""
+    df = jobs.sort_index()
+    df.index.name = 'job_name'
+    n = df['n']
+    df['avg_runtime'] = df['mean'].where(n > 0)
+    df['std_runtime'] = np.sqrt(df['m2'].clip(lower=0) / (n - 1)).where(n > 1)
+    df['total_runs'] = df['total_runs'].astype('int64')
+    df['total_success'] = df['total_success'].astype('int64')
+    df['success_rate'] = round(df['total_success'] / df['total_runs'] * 100, 2)
+    df['url'] = (
+        'https://cloud.getdbt.com/deploy/'
+        + df['account_id'].astype('int64').astype(str)
+        + '/projects/'
+        + df['project_id'].astype('int64').astype(str)
+        + '/jobs/'
+        + df['job_id'].astype('int64').astype(str)
+    )
+    df['job_id'] = df['job_id'].astype('float64')
+    df['last_run'] = df['last_run'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    cols = ['avg_runtime', 'last_runtime', 'std_runtime', 'max_runtime']
+    df[cols] = df[cols].astype('float64').round(1)
+    return df[STATS_COLUMNS]
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,99 @@
+# stdlib
+import json
+import threading
+from typing import Callable, Dict, List, Optional
+
+# first party
+from utils import client
+
+
+DEFAULT_BATCH_SIZE = 25
+
+
+def snake_to_camel(string: str):
+    first, *rest = string.split('_')
+    return first + ''.join([s.capitalize() for s in rest])
+
+
+def _graphql_value(value):
+    # numpy scalars (e.g. ids pulled out of a DataFrame)
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+
+    return json.dumps(value)
+
+
+def _selection_set(fields: List[str]) -> str:
+    nested: Dict[str, List[str]] = {}
+    for field in fields:
+        head, _, tail = field.partition('.')
+        nested.setdefault(snake_to_camel(head), [])
+        if tail:
+            nested[snake_to_camel(head)].append(tail)
+    parts = [
+        f'{name} {_selection_set(children)}' if children else name
+        for name, children in nested.items()
+    ]
+    return '{ ' + ' '.join(parts) + ' }'
+
+
+def build_batch_query(obj: str, arguments_list: List[Dict], fields: List[str]):
+    """Combine one `obj` lookup per arguments dict into a single GraphQL document.
+
+    Each lookup is aliased as r0, r1, ... in the order of arguments_list.
+    """
+    selection = _selection_set(fields)
+    aliases = []
+    for i, arguments in enumerate(arguments_list):
+        args = ', '.join([
+            f'{snake_to_camel(k)}: {_graphql_value(v)}'
+            for k, v in arguments.items() if v is not None
+        ])
+        aliases.append(f'  r{i}: {obj}({args}) {selection}')
+    return 'query {\n' + '\n'.join(aliases) + '\n}'
+
+
+def batch_request(
+    _prop,
+    obj: str,
+    arguments_list: List[Dict],
+    fields: List[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    on_progress: Callable[[float], None] = None,
+    concurrency: int = 1,
+) -> List[Optional[Dict]]:
+    """Run one Metadata API lookup per arguments dict, batch_size per request.
+
+    Up to concurrency requests are in flight at a time.  Returns the value of
+    `obj` for each arguments dict, in order, with None where the API returned
+    nothing for that lookup.
+    """
+    total = len(arguments_list)
+    chunks = [
+        arguments_list[start:start + batch_size]
+        for start in range(0, total, batch_size)
+    ]
+    done = []
+    lock = threading.Lock()
+
+    def fetch(chunk: List[Dict]) -> List[Optional[Dict]]:
+        response = client.dynamic_request(
+            _prop, 'query', build_batch_query(obj, chunk, fields)
+        )
+        data = response.get('data') or {}
+        if on_progress is not None:
+            with lock:
+                done.append(len(chunk))
+                on_progress(sum(done) / total)
+        return [data.get(f'r{i}') for i in range(len(chunk))]
+
+    results: List[Optional[Dict]] = []
+    for chunk_results in client.map_concurrently(fetch, chunks, concurrency):
+        results.extend(chunk_results)
+    return results
+
+
+if __name__ == '__main__':
+    pass
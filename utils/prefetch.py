@@ -0,0 +1,116 @@
+# stdlib
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Hashable, Iterable, Tuple
+
+# third party
+import streamlit as st
+
+
+# Most requests scheduled at a time, by default.  Prefetch workers are shared by
+# every session, and their requests also go through the client's scheduler.
+BUDGET = int(os.getenv('DBTC_STREAMLIT_PREFETCH_BUDGET', 10))
+MAX_WORKERS = 2
+
+# Seconds the page waits for a prefetch already running before making the
+# request itself
+WAIT_TIMEOUT = 2.0
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='prefetch')
+
+
+class Prefetcher:
+    """Warm the request cache in the background for one session.
+
+    Work is scheduled for a scope (e.g. the selected job); scheduling for a new
+    scope cancels everything still queued or not yet started for the old one.
+    Calls are made at most once per scope, finished or not.
+    """
+
+    def __init__(self):
+        self.scope = None
+        self._futures: Dict[Hashable, Future] = {}
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    def schedule(
+        self,
+        scope: Hashable,
+        calls: Iterable[Tuple[Hashable, Callable]],
+        budget: int = BUDGET,
+    ) -> int:
+        """Run up to budget of the (key, func) calls not already pending.
+
+        funcs run without a script run context, so must not use st.session_state.
+        Returns the number of calls scheduled.
+        """
+        with self._lock:
+            if scope != self.scope:
+                self._cancel()
+                self.scope = scope
+
+            scheduled = 0
+            for key, func in calls:
+                if scheduled >= budget:
+                    break
+                if key in self._futures:
+                    continue
+
+                self._futures[key] = _executor.submit(_run, self._cancelled, func)
+                scheduled += 1
+        return scheduled
+
+    def wait(self, key: Hashable, timeout: float = WAIT_TIMEOUT):
+        """Give the call for key, if it's running, up to timeout seconds to finish.
+
+        A call still queued (perhaps behind other sessions' work) is cancelled,
+        and one that failed or runs longer is left for the page to make itself,
+        as would one that was never prefetched.
+        """
+        with self._lock:
+            future = self._futures.get(key)
+        if future is None or future.cancel():
+            return
+
+        try:
+            future.result(timeout)
+        except Exception:
+            pass
+
+    def join(self, timeout: float = None):
+        """Block until every pending call has finished."""
+        with self._lock:
+            futures = list(self._futures.values())
+        wait(futures, timeout)
+
+    def _cancel(self):
+        # Calls already running finish, but their results are only cached
+        self._cancelled.set()
+        for future in self._futures.values():
+            future.cancel()
+        self._futures = {}
+        self._cancelled = threading.Event()
+
+
+def _run(cancelled: threading.Event, func: Callable):
+    if cancelled.is_set():
+        return None
+
+    try:
+        return func()
+    except BaseException:
+        # Prefetching is best effort, the page makes the request itself if
+        # needed.  Includes streamlit's StopException, should a call stop.
+        return None
+
+
+def get_prefetcher() -> Prefetcher:
+    """This session's Prefetcher."""
+    if 'prefetcher' not in st.session_state:
+        st.session_state.prefetcher = Prefetcher()
+    return st.session_state.prefetcher
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,190 @@
+# stdlib
+from typing import Dict, List, Tuple
+
+# third party
+import numpy as np
+import pandas as pd
+
+
+DATETIME_COLUMNS = [
+    'created_at',
+    'updated_at',
+    'dequeued_at',
+    'started_at',
+    'finished_at',
+    'should_start_at',
+    'last_checked_at',
+    'last_heartbeat_at',
+]
+DURATION_COLUMNS = {
+    'duration': 'duration_m',
+    'queued_duration': 'queued_duration_m',
+    'run_duration': 'run_duration_m',
+}
+ID_COLUMNS = [
+    'id',
+    'account_id',
+    'project_id',
+    'environment_id',
+    'job_definition_id',
+    'trigger_id',
+]
+CATEGORY_COLUMNS = ['status', 'status_humanized', 'job_name', 'trigger_cause']
+
+# The only run fields used downstream of list_runs
+RUN_COLUMNS = [
+    *ID_COLUMNS,
+    'status',
+    'status_humanized',
+    *DURATION_COLUMNS,
+    *DATETIME_COLUMNS,
+]
+
+# How the Admin API serializes run timestamps, e.g. 2023-03-06 20:03:01.735285+00:00
+RUN_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f%z'
+
+
+def _minutes(duration: str) -> float:
+    try:
+        h, m, s = duration.split(':')
+        return round(int(h) * 60 + int(m) + (int(s) / 60), 1)
+    except (AttributeError, ValueError):
+        return np.nan
+
+
+def durations_to_minutes(series: pd.Series) -> pd.Series:
+    """Convert HH:MM:SS duration strings to minutes, rounded to 1 decimal."""
+    # Durations repeat heavily across runs, so each distinct value is parsed
+    # once.  Python's round (not np.round) keeps the minutes the page always showed.
+    codes, uniques = pd.factorize(series)
+    minutes = np.array([_minutes(d) for d in uniques] + [np.nan], dtype=float)
+    return pd.Series(minutes[codes], index=series.index)
+
+
+def parse_datetimes(series: pd.Series) -> pd.Series:
+    """Parse Admin API timestamps as UTC, inferring only values not in the known format."""
+    parsed = pd.to_datetime(
+        series, format=RUN_DATETIME_FORMAT, errors='coerce', utc=True
+    )
+    missed = parsed.isna() & series.notna()
+    if missed.any():
+        parsed[missed] = pd.to_datetime(series[missed], utc=True)
+    return parsed
+
+
+def format_datetimes(series: pd.Series) -> pd.Series:
+    """Format UTC datetimes as YYYY-MM-DD HH:MM:SS strings."""
+    values = np.datetime_as_string(series.dt.tz_convert(None).to_numpy(), unit='s')
+    formatted = pd.Series(values, index=series.index).str.replace('T', ' ', regex=False)
+    return formatted.where(series.notna())
+
+
+def runs_to_frame(runs: List[Dict]) -> pd.DataFrame:
+    """Build a compact run frame from list_runs data.
+
+    Only RUN_COLUMNS are kept.  The related job (and trigger, when included)
+    is flattened to its name (cause), ids are downcast and low cardinality
+    fields are stored as categoricals.
+    """
+    columns = {c: [run.get(c) for run in runs] for c in RUN_COLUMNS}
+    columns['job_name'] = [(run.get('job') or {}).get('name') for run in runs]
+    if any('trigger' in run for run in runs):
+        columns['trigger_cause'] = [
+            (run.get('trigger') or {}).get('cause') for run in runs
+        ]
+    df = pd.DataFrame(columns)
+    for column in ID_COLUMNS:
+        df[column] = pd.to_numeric(df[column], downcast='integer')
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    return df
+
+
+def enhance_df(df: pd.DataFrame) -> pd.DataFrame:
+    # Convert to minutes
+    for column, minutes_column in DURATION_COLUMNS.items():
+        df[minutes_column] = durations_to_minutes(df[column])
+    df = df.drop(columns=list(DURATION_COLUMNS))
+
+    # Convert datetime columns
+    for column in DATETIME_COLUMNS:
+        df[column] = parse_datetimes(df[column])
+    df['created_at'] = format_datetimes(df['created_at'])
+
+    return add_averages(df)
+
+
+def add_averages(df: pd.DataFrame) -> pd.DataFrame:
+    df['run_duration_m_avg'] = df['run_duration_m'].mean()
+    df['queued_duration_m_avg'] = df['queued_duration_m'].mean()
+    return df
+
+
+def frame_digest(df: pd.DataFrame) -> int:
+    """Changes when runs are added, removed or change status."""
+    hashes = pd.util.hash_pandas_object(
+        df[['id', 'status', 'run_duration_m']], index=False
+    )
+    return int(hashes.sum())
+
+
+def concat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Stack enhanced run frames, recomputing the averages over all of them."""
+    df = pd.concat(frames, ignore_index=True)
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    return add_averages(df)
+
+
+def select_job_runs(
+    env_df: pd.DataFrame, job_id: int, n_runs: int
+) -> Tuple[pd.DataFrame, int]:
+    """A job's latest runs taken from its environment's latest n_runs runs.
+
+    Returns the runs and how many more, older ones are still needed.  The
+    environment frame holds every run newer than its oldest, so the job's runs
+    in it are its newest.  An environment frame shorter than n_runs holds the
+    environment's whole history, so nothing is missing.
+    """
+    job_df = env_df[env_df['job_definition_id'] == job_id].head(n_runs)
+    missing = 0 if len(env_df) < n_runs else n_runs - len(job_df)
+    return job_df, missing
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Positions of the points Largest-Triangle-Three-Buckets downsampling keeps.
+
+    x must be sorted (either direction).  The first and last points are always
+    kept, plus the point from each bucket in between that forms the largest
+    triangle with the previously kept point and the next bucket's average.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype='float64')
+    y = np.nan_to_num(np.asarray(y, dtype='float64'))
+    bucket_size = (n - 2) / (n_out - 2)
+    edges = (np.arange(n_out - 1) * bucket_size).astype(int) + 1
+    edges[-1] = n - 1
+    kept = np.empty(n_out, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        kept[i + 1] = a
+    return kept
+
+
+if __name__ == '__main__':
+    pass
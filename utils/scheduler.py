@@ -0,0 +1,223 @@
+# stdlib
+import os
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+# third party
+from requests.adapters import HTTPAdapter
+from urllib3 import PoolManager
+
+
+# Client side ceiling for requests to one API with one set of credentials.
+# Throttled responses halve the number of requests allowed in flight, which then
+# grows back by one per `limit` successful responses (AIMD).
+RATE_LIMIT = float(os.getenv('DBTC_STREAMLIT_RATE_LIMIT', 10))  # per second
+BURST = int(os.getenv('DBTC_STREAMLIT_RATE_BURST', 20))
+MAX_CONCURRENCY = int(os.getenv('DBTC_STREAMLIT_MAX_CONCURRENCY', 8))
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30
+RETRY_AFTER_MAX = 120
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+THROTTLE_STATUSES = (429, 503)
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+
+# Responses and body bytes received through ScheduledAdapters, per thread, so
+# callers can measure the requests they make
+_received = threading.local()
+
+
+def received() -> Tuple[int, int]:
+    """Responses and body bytes this thread has received through ScheduledAdapters."""
+    return getattr(_received, 'responses', 0), getattr(_received, 'bytes', 0)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta seconds or HTTP date)."""
+    if not value:
+        return None
+
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), RETRY_AFTER_MAX)
+
+
+def backoff(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Seconds to sleep before retry number attempt + 1 (full jitter)."""
+    if retry_after is not None:
+        return retry_after
+
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+class RequestScheduler:
+    """Token bucket and adaptive concurrency limit shared by every request to an API.
+
+    `call` runs a request once a token and an in-flight slot are available,
+    retrying with backoff while `classify` reports a retryable status.
+    """
+
+    def __init__(
+        self,
+        rate: float = RATE_LIMIT,
+        burst: int = BURST,
+        max_concurrency: int = MAX_CONCURRENCY,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.limit = float(max_concurrency)
+        self.active = 0
+        self.stats: Counter = Counter()
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self.active >= int(self.limit):
+                        wait = None  # until a request finishes
+                    elif self._tokens >= 1:
+                        self._tokens -= 1
+                        self.active += 1
+                        self.stats['requests'] += 1
+                        return
+                    else:
+                        wait = (1 - self._tokens) / self.rate
+                self._cond.wait(wait)
+
+    def release(self, status: Optional[int] = None, retry_after: Optional[float] = None):
+        """Free a slot, adapting to the status of a failed response (if any)."""
+        with self._cond:
+            self.active -= 1
+            if status in THROTTLE_STATUSES:
+                self.stats['throttled'] += 1
+                self.limit = max(1.0, self.limit / 2)
+                self._tokens = min(self._tokens, 0.0)
+                if retry_after:
+                    self._paused_until = max(
+                        self._paused_until, time.monotonic() + retry_after
+                    )
+            elif status is None:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+    def call(
+        self,
+        func: Callable[[], Any],
+        classify: Callable[[Any], Tuple[Optional[int], Optional[float]]],
+        discard: Callable[[Any], None] = None,
+    ) -> Any:
+        """Run func, retrying while classify(result) returns a status.
+
+        classify returns the failed status and Retry-After seconds, or
+        (None, None) for a result to keep.  Results that are retried are passed
+        to discard.  The last result is returned once retries run out.
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            self.acquire()
+            try:
+                result = func()
+            except BaseException:
+                self.release(0)  # neither a success nor throttled
+                raise
+
+            status, retry_after = classify(result)
+            self.release(status, retry_after)
+            if status is None or attempt == MAX_RETRIES:
+                return result
+
+            self.stats['retries'] += 1
+            if discard is not None:
+                discard(result)
+            time.sleep(backoff(attempt, retry_after))
+
+
+class ScheduledAdapter(HTTPAdapter):
+    """Send a session's requests through a RequestScheduler.
+
+    429s are always retried since the request was not processed; 5xx only for
+    retry_methods.  Connections come from pool_manager when given, so that
+    sessions can share them, rather than from a pool of the adapter's own.
+    """
+
+    def __init__(
+        self,
+        scheduler: RequestScheduler,
+        retry_methods: Iterable[str] = IDEMPOTENT_METHODS,
+        pool_manager: PoolManager = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.scheduler = scheduler
+        self.retry_methods = frozenset(retry_methods)
+        self.shared_pool = pool_manager is not None
+        if pool_manager is not None:
+            self.poolmanager = pool_manager
+
+    def close(self):
+        # A shared pool outlives the sessions using it
+        if not self.shared_pool:
+            return super().close()
+
+        for proxy in self.proxy_manager.values():
+            proxy.clear()
+
+    def send(self, request, **kwargs):
+        def classify(response):
+            status = response.status_code
+            if status == 429 or (
+                status in RETRY_STATUSES and request.method in self.retry_methods
+            ):
+                return status, parse_retry_after(response.headers.get('Retry-After'))
+            return None, None
+
+        response = self.scheduler.call(
+            lambda: super(ScheduledAdapter, self).send(request, **kwargs),
+            classify,
+            lambda response: response.close(),
+        )
+
+        # Streamed bodies aren't read here, so count their Content-Length
+        if kwargs.get('stream'):
+            size = response.headers.get('Content-Length')
+        else:
+            size = len(response.content)
+        responses, received_bytes = received()
+        _received.responses = responses + 1
+        _received.bytes = received_bytes + int(size or 0)
+        return response
+
+
+def graphql_error_status(response: Any) -> Tuple[Optional[int], Optional[float]]:
+    """classify for sgqlc results, which report HTTP errors inside `errors`."""
+    if not isinstance(response, dict):
+        return None, None
+
+    for error in response.get('errors') or []:
+        if isinstance(error, dict) and error.get('status') in RETRY_STATUSES:
+            headers = error.get('headers') or {}
+            return error['status'], parse_retry_after(headers.get('Retry-After'))
+    return None, None
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,65 @@
+# stdlib
+from typing import Any, Callable, Hashable, Tuple
+
+# third party
+import streamlit as st
+
+
+# Each stage keeps its last result per session, along with the key it was
+# computed for and a version that changes whenever the result does.  Later
+# stages include the versions of the stages they read from in their keys.
+
+
+def _stages() -> dict:
+    if 'stages' not in st.session_state:
+        st.session_state.stages = {}
+    return st.session_state.stages
+
+
+def get(name: str, key: Hashable) -> Tuple[bool, Any]:
+    """Whether stage name has a result for key, and the result."""
+    entry = _stages().get(name)
+    if entry is None or entry['key'] != key:
+        return False, None
+
+    return True, entry['value']
+
+
+def put(name: str, key: Hashable, value: Any, digest: Hashable = None) -> Any:
+    """Store value as stage name's result for key.
+
+    The stage's version is kept if digest is given and equal to the previous
+    result's, so a stage recomputed with the same outcome doesn't invalidate
+    the stages after it.
+    """
+    stages = _stages()
+    entry = stages.get(name)
+    version = entry['version'] if entry is not None else 0
+    if entry is None or digest is None or entry['digest'] != digest:
+        version += 1
+    stages[name] = {
+        'key': key,
+        'value': value,
+        'digest': digest,
+        'version': version,
+    }
+    return value
+
+
+def run(name: str, key: Hashable, func: Callable[[], Any]) -> Any:
+    """Stage name's result for key, calling func only if there isn't one."""
+    hit, value = get(name, key)
+    if hit:
+        return value
+
+    return put(name, key, func())
+
+
+def version(name: str) -> int:
+    """Changes whenever stage name's result does; 0 before it has one."""
+    entry = _stages().get(name)
+    return entry['version'] if entry is not None else 0
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,250 @@
+# stdlib
+import hashlib
+import json
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List
+
+# first party
+from utils import client
+
+
+STORE_DIR = os.getenv('DBTC_STREAMLIT_STORE_DIR', '.dbtc_store')
+
+# Queued, starting and running - these can still change on the next sync
+PENDING_STATUSES = (1, 2, 3)
+
+_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+
+
+def _store_path(host: str, account_id: int, **scope) -> str:
+    key = json.dumps(
+        {'host': host, 'account_id': account_id, **scope},
+        sort_keys=True,
+        default=str,
+    )
+    digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+    return os.path.join(STORE_DIR, f'runs_{account_id}_{digest}.json')
+
+
+def _load(path: str) -> Dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'runs': [], 'complete': False}
+
+
+def _save(path: str, store: Dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(store, f)
+    os.replace(tmp_path, path)
+
+
+def _fetch_newer_runs(
+    _prop, account_id: int, max_finished_id: int, **kwargs
+) -> List[Dict]:
+    newer = []
+    offset = 0
+    while True:
+        data = client.request(
+            _prop,
+            'list_runs',
+            account_id,
+            offset=offset,
+            limit=client.DEFAULT_PAGE_SIZE,
+            order_by='-id',
+            **kwargs,
+        ).get('data', [])
+        newer.extend([r for r in data if r['id'] > max_finished_id])
+        if (
+            len(data) < client.DEFAULT_PAGE_SIZE
+            or any(r['id'] <= max_finished_id for r in data)
+        ):
+            return newer
+
+        offset += client.DEFAULT_PAGE_SIZE
+
+
+def _refresh_runs(
+    _prop, account_id: int, runs: Dict, run_ids: List[int], concurrency: int, **kwargs
+):
+    refreshed = client.map_concurrently(
+        lambda run_id: client.request(
+            _prop,
+            'get_run',
+            account_id,
+            run_id,
+            include_related=kwargs.get('include_related'),
+        ).get('data'),
+        run_ids,
+        concurrency,
+    )
+    for run in refreshed:
+        if run is not None:
+            runs[run['id']] = run
+
+
+def iter_runs(
+    _prop, account_id: int, n_runs: int, concurrency: int = 1, **kwargs
+) -> Iterator[List[Dict]]:
+    """Yield the latest runs, newest first, as they're synced into the run store.
+
+    Only runs newer than the highest finished run already stored are requested
+    from `list_runs`, along with any stored runs that were still pending at the
+    last sync.  If the store holds fewer than n_runs runs, older history is
+    backfilled from the API.  kwargs are the `list_runs` filters (e.g.
+    environment_id or job_definition_id) and scope the store.
+
+    The stored runs are yielded first, then the runs so far after each wave
+    of backfilled pages; the last list yielded is the complete result.  The
+    store's lock is only held to read and write it, never across a yield, so
+    a caller that stops early doesn't block other sessions.
+    """
+    path = _store_path(_prop._host, account_id, **kwargs)
+    with _locks[path]:
+        store = _load(path)
+    runs = {r['id']: r for r in store['runs']}
+    complete = store['complete']
+    finished_ids = [
+        i for i, r in runs.items() if r['status'] not in PENDING_STATUSES
+    ]
+    if finished_ids:
+        max_finished_id = max(finished_ids)
+        for run in _fetch_newer_runs(
+            _prop, account_id, max_finished_id, **kwargs
+        ):
+            runs[run['id']] = run
+
+        stale_ids = [
+            i for i, r in runs.items()
+            if r['status'] in PENDING_STATUSES and i < max_finished_id
+        ]
+        _refresh_runs(_prop, account_id, runs, stale_ids, concurrency, **kwargs)
+    else:
+        # Nothing finished to sync from, start the history over
+        runs = {}
+        complete = False
+
+    ordered = sorted(runs.values(), key=lambda r: r['id'], reverse=True)
+    try:
+        if len(ordered) < n_runs and not complete:
+            if ordered:
+                yield ordered[:n_runs]
+
+            missing = n_runs - len(ordered)
+            backfilled = 0
+            for older in client.iter_paginated_request(
+                _prop,
+                'list_runs',
+                account_id,
+                max_items=missing,
+                start=len(ordered),
+                concurrency=concurrency,
+                cached=False,
+                order_by='-id',
+                **kwargs,
+            ):
+                backfilled += len(older)
+                seen = set(runs.keys())
+                for run in older:
+                    if run['id'] not in seen:
+                        runs[run['id']] = run
+                        ordered.append(run)
+                if backfilled < missing:
+                    yield ordered[:n_runs]
+            complete = backfilled < missing
+    finally:
+        # Also keep what was backfilled if the caller stopped early
+        store = {
+            'runs': ordered,
+            'complete': complete,
+            'through_id': ordered[0]['id'] + 1 if ordered else 0,
+            'synced_at': datetime.now(timezone.utc).isoformat(),
+        }
+        with _locks[path]:
+            _save(path, store)
+
+    yield ordered[:n_runs]
+
+
+def older_runs(
+    _prop,
+    account_id: int,
+    before_id: int,
+    n_runs: int,
+    offset: int,
+    concurrency: int = 1,
+    **kwargs,
+) -> List[Dict]:
+    """Return up to n_runs runs with ids below before_id, newest first.
+
+    For filling in history older than runs already at hand: offset is how
+    many runs have ids of before_id or more, i.e. where paging through
+    `list_runs` newest first reaches before_id.  Runs are read from the run
+    store scoped by kwargs (as in `iter_runs`), and only those it doesn't have
+    are requested and added to it.
+    """
+    path = _store_path(_prop._host, account_id, **kwargs)
+    with _locks[path]:
+        store = _load(path)
+        runs = {r['id']: r for r in store['runs']}
+
+        # Stored history has no gaps below through_id; catch up first if that
+        # doesn't reach before_id
+        finished_ids = [
+            i for i, r in runs.items() if r['status'] not in PENDING_STATUSES
+        ]
+        through_id = store.get('through_id', max(runs, default=-1) + 1)
+        if finished_ids and through_id < before_id:
+            for run in _fetch_newer_runs(_prop, account_id, max(finished_ids), **kwargs):
+                runs[run['id']] = run
+        elif not finished_ids:
+            runs = {}
+            store['complete'] = False
+
+        older = sorted(
+            (r for r in runs.values() if r['id'] < before_id),
+            key=lambda r: r['id'],
+            reverse=True,
+        )[:n_runs]
+        _refresh_runs(
+            _prop,
+            account_id,
+            runs,
+            [r['id'] for r in older if r['status'] in PENDING_STATUSES],
+            concurrency,
+            **kwargs,
+        )
+        if len(older) < n_runs and not store['complete']:
+            missing = n_runs - len(older)
+            fetched = client.paginated_request(
+                _prop,
+                'list_runs',
+                account_id,
+                max_items=missing,
+                start=offset + len(older),
+                concurrency=concurrency,
+                cached=False,
+                order_by='-id',
+                **kwargs,
+            )
+            store['complete'] = len(fetched) < missing
+            for run in fetched:
+                runs.setdefault(run['id'], run)
+
+        ordered = sorted(runs.values(), key=lambda r: r['id'], reverse=True)
+        store['runs'] = ordered
+        store['through_id'] = max(before_id, max(runs, default=-1) + 1)
+        store['synced_at'] = datetime.now(timezone.utc).isoformat()
+        _save(path, store)
+
+    return [r for r in ordered if r['id'] < before_id][:n_runs]
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,83 @@
+# stdlib
+import heapq
+from collections import defaultdict
+from typing import Dict, List
+
+# third party
+import pandas as pd
+
+
+# What each model contributes to its series
+POINT_COLUMNS = ['name', 'executeStartedAt', 'executionTime', 'status', 'runId']
+
+
+class TopModels:
+    """Per-model execution time totals over runs, with the series of the top n.
+
+    Runs are added one at a time with `update`.  Every model's total is kept,
+    but points only for the models currently in the top n.  A model that
+    enters the top n after the first run is missing its points from earlier
+    runs; `backfill` adds them once `incomplete` says which runs to read again.
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+        self.runs = 0
+        self.totals: Dict[str, float] = defaultdict(float)
+        self._series: Dict[str, List[Dict]] = {}
+
+        # Index of the first run each top model has every point since
+        self._since: Dict[str, int] = {}
+
+    def update(self, models: List[Dict]):
+        """Add the models of the next run."""
+        index = self.runs
+        self.runs += 1
+        for model in models:
+            if model.get('executionTime') is not None:
+                self.totals[model['name']] += model['executionTime']
+
+        top = set(self.top())
+        for name in list(self._series):
+            if name not in top:
+                del self._series[name]
+                del self._since[name]
+        for name in top:
+            if name not in self._series:
+                self._series[name] = []
+                self._since[name] = index
+        self._add(models)
+
+    def top(self) -> List[str]:
+        return heapq.nlargest(self.n, self.totals, key=self.totals.get)
+
+    def incomplete(self) -> int:
+        """Runs (from the first) that hold points missing from a top model's series."""
+        return max(self._since.values(), default=0)
+
+    def backfill(self, index: int, models: List[Dict]):
+        """Add the missing points from the models of run number index."""
+        self._add(models, index)
+
+    def _add(self, models: List[Dict], index: int = None):
+        for model in models:
+            name = model.get('name')
+            if name not in self._series:
+                continue
+            if index is not None and index >= self._since[name]:
+                continue
+
+            self._series[name].append({c: model.get(c) for c in POINT_COLUMNS})
+
+    def to_frame(self) -> pd.DataFrame:
+        """Points of the top models, in order of when they started."""
+        df = pd.DataFrame(
+            [point for series in self._series.values() for point in series],
+            columns=POINT_COLUMNS,
+        )
+        df['executeStartedAt'] = pd.to_datetime(df['executeStartedAt'], utc=True)
+        return df.sort_values('executeStartedAt', ignore_index=True)
+
+
+if __name__ == '__main__':
+    pass
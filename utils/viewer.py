@@ -0,0 +1,169 @@
+# stdlib
+import json
+from typing import Any, Dict, List, Optional
+
+# third party
+import pandas as pd
+import streamlit as st
+
+
+# Responses are kept in session state and summarized; only nodes up to
+# MAX_RENDER_BYTES (as JSON) are rendered whole, and previews are truncated.
+MAX_RENDER_BYTES = 50 * 1024
+PREVIEW_ROWS = 20
+MAX_CHILDREN = 200
+MAX_CELL_CHARS = 80
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, default=str))
+
+
+def _describe(value: Any) -> str:
+    if isinstance(value, dict):
+        return f'{{{len(value)} keys}}'
+    if isinstance(value, list):
+        return f'[{len(value)} items]'
+
+    text = str(value)
+    if len(text) > MAX_CELL_CHARS:
+        return text[:MAX_CELL_CHARS] + '...'
+    return text
+
+
+def find_records(data: Any) -> Optional[List]:
+    """The list of records in a response, if it has one.
+
+    Admin API responses hold them in `data`, Metadata API responses in the
+    only field under `data`.
+    """
+    node = data
+    for _ in range(3):
+        if isinstance(node, list):
+            return node
+        if not isinstance(node, dict):
+            return None
+        if 'data' in node:
+            node = node['data']
+        elif len(node) == 1:
+            node = next(iter(node.values()))
+        else:
+            return None
+    return node if isinstance(node, list) else None
+
+
+def preview_frame(records: List, n: int = PREVIEW_ROWS) -> pd.DataFrame:
+    """The first n records as a table, with nested values summarized."""
+    rows = [
+        {k: _describe(v) for k, v in record.items()} if isinstance(record, dict)
+        else {'value': _describe(record)}
+        for record in records[:n]
+    ]
+    return pd.DataFrame(rows)
+
+
+def resolve(data: Any, path: List) -> Any:
+    """The node at path (keys and indices) in data."""
+    node = data
+    for part in path:
+        node = node[part]
+    return node
+
+
+def _children(node: Any) -> Dict:
+    if isinstance(node, dict):
+        return {k: node[k] for k in list(node)[:MAX_CHILDREN]}
+    if isinstance(node, list):
+        return {i: node[i] for i in range(min(len(node), MAX_CHILDREN))}
+    return {}
+
+
+def put_result(key: str, source: str, data: Any):
+    """Keep a response in session state for draw_result to show on later reruns."""
+    st.session_state[key] = {
+        'source': source,
+        'data': data,
+        'payload': json.dumps(data, default=str),
+    }
+    st.session_state[f'{key}_path'] = []
+    st.session_state[f'{key}_child'] = None
+
+
+def draw_result(key: str, source: str):
+    """Summarize the response kept under key, if it came from source.
+
+    Shows its size, top-level keys and a preview of its records, then the node
+    at the selected path, opening one level at a time.  The whole payload is
+    only sent to the browser as a download.
+    """
+    result = st.session_state.get(key)
+    if result is None or result['source'] != source:
+        return
+
+    data = result['data']
+    path_key = f'{key}_path'
+    path = st.session_state.get(path_key, [])
+
+    records = find_records(data)
+    size = len(result['payload'])
+    col1, col2, col3 = st.columns(3)
+    col1.metric('Records', len(records) if records is not None else '-')
+    col2.metric('Top-level Keys', len(data) if isinstance(data, dict) else '-')
+    col3.metric('Size', f'{round(size / 1024, 1)} KB')
+    if isinstance(data, dict):
+        st.caption('Keys: ' + ', '.join(f'`{k}`' for k in data))
+    st.download_button(
+        label='Download full response',
+        data=result['payload'],
+        file_name=f'{source}.json',
+        mime='application/json',
+        key=f'{key}_download',
+    )
+    if records:
+        st.write(f'First {min(len(records), PREVIEW_ROWS)} of {len(records)} records')
+        st.dataframe(preview_frame(records), use_container_width=True)
+
+    st.write('Explore')
+    node = resolve(data, path)
+    st.caption(' / '.join(['response', *[str(p) for p in path]]))
+
+    def up():
+        st.session_state[path_key] = path[:-1]
+        st.session_state[f'{key}_child'] = None
+
+    def open_child():
+        child = st.session_state[f'{key}_child']
+        if child is not None:
+            st.session_state[path_key] = [*path, child]
+            st.session_state[f'{key}_child'] = None
+
+    if path:
+        st.button('Up', key=f'{key}_up', on_click=up)
+
+    children = _children(node)
+    if children:
+        st.dataframe(
+            pd.DataFrame({
+                'key': [str(k) for k in children],
+                'value': [_describe(v) for v in children.values()],
+            }),
+            use_container_width=True,
+        )
+        st.selectbox(
+            'Open',
+            options=[None, *[k for k, v in children.items() if isinstance(v, (dict, list))]],
+            format_func=lambda x: '' if x is None else str(x),
+            key=f'{key}_child',
+            on_change=open_child,
+        )
+
+    if not isinstance(node, (dict, list)):
+        st.code(str(node))
+    elif (size if node is data else _size(node)) <= MAX_RENDER_BYTES:
+        st.json(node, expanded=False)
+    else:
+        st.info('This node is too large to show whole.  Open one of its keys, or download it.')
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,140 @@
+# stdlib
+import copy
+import threading
+import time
+from typing import Dict, Hashable, Iterable, List, Optional
+
+# first party
+from utils import cache, client
+
+
+# Runs are polled every MIN_INTERVAL seconds at first and after each status
+# change, backing off by BACKOFF while the status stays the same.
+MIN_INTERVAL = 2.0
+MAX_INTERVAL = 30.0
+BACKOFF = 1.5
+KEEP_FINISHED = 3600  # seconds a finished run is kept for pages to show
+MAX_ERRORS = 5  # failed polls in a row before a run stops being watched
+FINISHED_STATUSES = (10, 20, 30)  # Success, Error, Cancelled
+
+
+class RunWatcher:
+    """Poll the status of triggered runs from one background thread.
+
+    Every session's runs are watched by the same thread, and a run watched by
+    several sessions is polled once.  Pages read the latest state with `get`.
+    """
+
+    def __init__(self):
+        self._runs: Dict[Hashable, Dict] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(
+        self,
+        prop,
+        account_id: int,
+        run: Dict,
+        max_interval: float = MAX_INTERVAL,
+    ) -> Hashable:
+        """Start watching a run (the `data` of a trigger_job response).  Returns its key."""
+        key = (cache.fingerprint(prop), run['id'])
+        client.get_scheduler(prop)
+        now = time.monotonic()
+        with self._cond:
+            if key not in self._runs:
+                self._runs[key] = {
+                    # dbtc sets the API version path per call, so this thread
+                    # needs a copy of its own
+                    'prop': copy.copy(prop),
+                    'account_id': account_id,
+                    'run': run,
+                    'watched_at': now,
+                    'finished_at': now if run['status'] in FINISHED_STATUSES else None,
+                    'interval': MIN_INTERVAL,
+                    'max_interval': max(max_interval, MIN_INTERVAL),
+                    'next_poll': now + MIN_INTERVAL,
+                    'polls': 0,
+                    'errors': 0,
+                    'error': None,
+                }
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._loop, name='run-watcher', daemon=True
+                )
+                self._thread.start()
+            self._cond.notify_all()
+        return key
+
+    def get(self, keys: Iterable[Hashable]) -> List[Dict]:
+        """The latest state of each watched run in keys (those still kept)."""
+        with self._cond:
+            return [
+                {k: v for k, v in self._runs[key].items() if k != 'prop'}
+                for key in keys if key in self._runs
+            ]
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                for key, entry in list(self._runs.items()):
+                    finished_at = entry['finished_at']
+                    if finished_at is not None and now - finished_at > KEEP_FINISHED:
+                        del self._runs[key]
+                active = [e for e in self._runs.values() if e['finished_at'] is None]
+                if not self._runs:
+                    self._thread = None
+                    return
+
+                due = [e for e in active if e['next_poll'] <= now]
+                if not due:
+                    next_poll = min((e['next_poll'] for e in active), default=now + KEEP_FINISHED)
+                    self._cond.wait(next_poll - now)
+                    continue
+
+            for entry in due:
+                self._poll(entry)
+
+    def _poll(self, entry: Dict):
+        run, error = None, None
+        try:
+            # Called directly, as client.request would st.stop on connection
+            # errors; the session's adapter still schedules the request
+            response = entry['prop'].get_run(entry['account_id'], entry['run']['id'])
+            run = response.get('data')
+            if run is None:
+                error = response.get('status', {}).get('user_message') or 'No run returned'
+        except Exception as e:
+            error = str(e)
+
+        with self._cond:
+            now = time.monotonic()
+            changed = run is not None and run['status'] != entry['run']['status']
+            entry['polls'] += 1
+            entry['errors'] = entry['errors'] + 1 if error is not None else 0
+            entry['error'] = error
+            if run is not None:
+                entry['run'] = run
+            if (
+                run is not None and run['status'] in FINISHED_STATUSES
+                or entry['errors'] >= MAX_ERRORS
+            ):
+                entry['finished_at'] = now
+            entry['interval'] = (
+                MIN_INTERVAL if changed
+                else min(entry['interval'] * BACKOFF, entry['max_interval'])
+            )
+            entry['next_poll'] = now + entry['interval']
+
+
+_watcher = RunWatcher()
+
+
+def get_watcher() -> RunWatcher:
+    """The RunWatcher shared by every session."""
+    return _watcher
+
+
+if __name__ == '__main__':
+    pass